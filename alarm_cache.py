@@ -0,0 +1,135 @@
+import datetime
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from alarm_record import Alarm
+from occurrence_engine import FireTable, FIRE_TABLE_WINDOW
+
+
+class _AlarmSnapshot:
+    """One load of the alarms table with its lookup indexes and fire table"""
+
+    def __init__(self, version: int, alarms: List[Alarm]):
+        self.version = version
+        self.alarms = alarms  # Ordered by (minute_of_day, id)
+        self.by_id: Dict[int, Alarm] = {alarm.id: alarm for alarm in alarms}
+        self.active = [alarm for alarm in alarms if alarm.is_active]
+        self._fire_table: Optional[FireTable] = None
+
+    def fire_table(self, start: datetime.datetime, end: datetime.datetime) -> FireTable:
+        """Fire instants of the active alarms covering [start, end], rolled forward as needed"""
+        table = self._fire_table
+        if table is None or not table.covers(start, end):
+            table = FireTable(self.active, start, max(end, start + FIRE_TABLE_WINDOW))
+            self._fire_table = table
+        return table
+
+
+class AlarmCache:
+    """Read-through in-memory copy of the alarms table
+
+    The table is loaded on first read and served from memory afterwards.
+    Writes made through this process call invalidate(); writes from other
+    processes are noticed through PRAGMA data_version, checked on a private
+    connection at most once every `max_staleness` seconds, so steady-state
+    reads run no SQL at all.
+    """
+
+    def __init__(self, db_path: str, loader: Callable[[], List[Alarm]],
+                 max_staleness: float = 1.0):
+        self.db_path = db_path
+        self.loader = loader
+        self.max_staleness = max_staleness
+        self._snapshot: Optional[_AlarmSnapshot] = None
+        self._generation = 0  # Bumped by every invalidate()
+        self._loads = 0
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._alarms_version: Optional[int] = None
+
+    def invalidate(self):
+        """Drop the cached alarms; the next read reloads them"""
+        self._generation += 1
+        self._snapshot = None
+
+    def close(self):
+        """Close the version-check connection and drop the cache"""
+        with self._lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+            self._snapshot = None
+
+    def version(self) -> int:
+        """Counter that changes whenever the cached alarm set is reloaded"""
+        return self._current().version
+
+    def all(self) -> List[Alarm]:
+        """Every alarm ordered by time"""
+        return list(self._current().alarms)
+
+    def active(self) -> List[Alarm]:
+        """Active alarms ordered by time"""
+        return list(self._current().active)
+
+    def get(self, alarm_id: int) -> Optional[Alarm]:
+        """One alarm by id"""
+        return self._current().by_id.get(alarm_id)
+
+    def fire_table(self, start: datetime.datetime, end: datetime.datetime) -> FireTable:
+        """Precomputed UTC fire instants of the cached active alarms over [start, end]"""
+        return self._current().fire_table(start, end)
+
+    def _current(self) -> _AlarmSnapshot:
+        """The cached snapshot, reloaded if it was invalidated or another process wrote"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() >= self._next_check:
+                if self._external_change():
+                    self._snapshot = None
+                self._next_check = time.monotonic() + self.max_staleness
+
+            snapshot = self._snapshot
+            if snapshot is not None:
+                return snapshot
+
+            generation = self._generation
+            # Sync the counters first so a write racing the load is seen next check
+            self._external_change()
+            self._loads += 1
+            snapshot = _AlarmSnapshot(self._loads, self.loader())
+            self._next_check = time.monotonic() + self.max_staleness
+            # A write invalidated us mid-load: serve this result once, keep nothing
+            if generation == self._generation:
+                self._snapshot = snapshot
+            return snapshot
+
+    def _external_change(self) -> bool:
+        """Whether the alarms table changed since the last check (caller holds the lock)"""
+        try:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+
+            # PRAGMA data_version only moves when another connection commits;
+            # history writes move it too, so confirm with the alarms counter
+            data_version = self._version_conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version == self._data_version:
+                return False
+            self._data_version = data_version
+
+            row = self._version_conn.execute(
+                "SELECT version FROM data_version WHERE name = 'alarms'"
+            ).fetchone()
+            alarms_version = row[0] if row else None
+            changed = alarms_version != self._alarms_version
+            self._alarms_version = alarms_version
+            return changed
+        except Exception as e:
+            print(f"Error checking alarm cache version: {e}")
+            return True
@@ -0,0 +1,189 @@
+"""Streaming bulk import and export of alarms as CSV or JSON lines
+
+    python alarm_io.py import alarms.csv [--db alarms.db] [--batch-size 10000]
+    python alarm_io.py export alarms.jsonl [--db alarms.db]
+
+CSV files have the columns name,time,days,is_active,timezone,sound with days
+separated by ";" (e.g. "monday;friday"), an optional IANA timezone (empty
+for local time) and an optional sound ("classic", "tone:880", ...; empty
+for the default). JSON-lines files hold one object per line with
+the same keys and days as a list. The format follows the file extension
+unless --format is given. Rows are read and written in fixed-size batches,
+so memory stays bounded whatever the file size.
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from zoneinfo import ZoneInfo
+from database import AlarmDatabase
+from scheduler import WEEKDAY_MAP, time_to_minute
+
+CSV_FIELDS = ["name", "time", "days", "is_active", "timezone", "sound"]
+
+
+def detect_format(path: str, format: Optional[str] = None) -> str:
+    """Pick "csv" or "jsonl" from an explicit format or the file extension"""
+    if format:
+        return format
+    return "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def _parse_bool(value) -> bool:
+    """Read an is_active value from CSV text or JSON"""
+    if isinstance(value, bool):
+        return value
+    if value is None or value == "":
+        return True
+    return str(value).strip().lower() in ("1", "true", "yes", "si", "sí")
+
+
+def _normalize(record: Dict) -> Dict:
+    """Validate one imported record and convert it to create_alarms_bulk form"""
+    name = str(record["name"]).strip()
+    if not name:
+        raise ValueError("empty name")
+
+    days = record["days"]
+    if isinstance(days, str):
+        days = [day for day in days.replace(",", ";").split(";") if day.strip()]
+    if any(not isinstance(day, str) for day in days):
+        raise ValueError(f"invalid days: {record['days']}")
+    days = [day.strip().lower() for day in days]
+    if not days or any(day not in WEEKDAY_MAP for day in days):
+        raise ValueError(f"invalid days: {record['days']}")
+
+    alarm_time = str(record["time"]).strip()
+    time_to_minute(alarm_time)  # Raises ValueError unless a valid HH:MM
+
+    timezone = str(record.get("timezone") or "").strip() or None
+    if timezone:
+        ZoneInfo(timezone)  # Unknown zones raise a KeyError subclass
+
+    sound = str(record.get("sound") or "").strip() or None
+    if sound:
+        # Imported here so files without sounds never load NumPy
+        from alarm_sound import sound_pattern
+        sound_pattern(sound)  # Unknown sounds raise ValueError
+
+    return {
+        "name": name,
+        "time": alarm_time,
+        "days": days,
+        "is_active": _parse_bool(record.get("is_active")),
+        "timezone": timezone,
+        "sound": sound,
+    }
+
+
+def read_alarms(path: str, format: Optional[str] = None,
+                on_error: Optional[Callable[[int, Exception], None]] = None) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line_number, raw record) pairs from a CSV or JSON-lines file
+
+    Malformed JSON lines are passed to `on_error` and skipped; without it
+    they raise.
+    """
+    format = detect_format(path, format)
+    with open(path, newline="", encoding="utf-8") as handle:
+        if format == "csv":
+            # Line 1 is the header
+            for line_number, record in enumerate(csv.DictReader(handle), start=2):
+                yield line_number, record
+        else:
+            for line_number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    if on_error is None:
+                        raise
+                    on_error(line_number, e)
+                    continue
+                yield line_number, record
+
+
+def import_alarms(db: AlarmDatabase, path: str, format: Optional[str] = None,
+                  batch_size: int = 10000) -> Tuple[int, int]:
+    """Import alarms in batches of one transaction each; returns (imported, skipped)"""
+    imported = 0
+    skipped = 0
+
+    def skip(line_number: int, error: Exception):
+        nonlocal skipped
+        skipped += 1
+        print(f"Skipping line {line_number}: {error}")
+
+    def valid_records():
+        for line_number, record in read_alarms(path, format, on_error=skip):
+            try:
+                yield _normalize(record)
+            except (KeyError, ValueError, TypeError) as e:
+                skip(line_number, e)
+
+    records = valid_records()
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if not batch:
+            break
+        imported += db.create_alarms_bulk(batch)
+    return imported, skipped
+
+
+def export_alarms(db: AlarmDatabase, path: str, format: Optional[str] = None,
+                  batch_size: int = 10000) -> int:
+    """Write every alarm to a CSV or JSON-lines file; returns how many were written"""
+    format = detect_format(path, format)
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=CSV_FIELDS) if format == "csv" else None
+        if writer:
+            writer.writeheader()
+
+        for alarm in db.iter_all_alarms(batch_size):
+            record = {
+                "name": alarm["name"],
+                "time": alarm["time"],
+                "days": alarm["days"],
+                "is_active": alarm["is_active"],
+                "timezone": alarm["timezone"],
+                "sound": alarm["sound"],
+            }
+            if writer:
+                record["days"] = ";".join(record["days"])
+                record["is_active"] = int(record["is_active"])
+                record["timezone"] = record["timezone"] or ""
+                record["sound"] = record["sound"] or ""
+                writer.writerow(record)
+            else:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            written += 1
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import or export alarms")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="CSV or JSON-lines file")
+    parser.add_argument("--db", default="alarms.db", help="SQLite database path")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Override the file extension")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per transaction")
+    args = parser.parse_args()
+
+    db = AlarmDatabase(args.db)
+    try:
+        if args.command == "import":
+            imported, skipped = import_alarms(db, args.path, args.format, args.batch_size)
+            print(f"Imported {imported} alarms ({skipped} skipped)")
+            return 1 if skipped and not imported else 0
+        written = export_alarms(db, args.path, args.format, args.batch_size)
+        print(f"Exported {written} alarms")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
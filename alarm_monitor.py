@@ -1,21 +1,39 @@
 import threading
 import time
 import datetime
-from typing import Dict
+from typing import Optional
 from database import AlarmDatabase
-from audio_player import AudioPlayer
+from alarm_record import Alarm, Timer
+from occurrence_engine import utc_to_local
+from monitor_core import MonitorCore, timer_sound
+
+
+class AlarmMonitor(MonitorCore):
+    def __init__(self, db: AlarmDatabase, mode: str = "scheduler", max_sleep: float = 60.0,
+                 clock=None, audio: bool = True):
+        # Anything with now() returning an aware UTC datetime (e.g. FakeClock
+        # for simulations); waits still use real time
+        self.clock = clock
+        # Headless (audio=False) never loads pygame; otherwise the player and
+        # its mixer are created when monitoring starts (see warm_up_audio)
+        self.audio = audio
+        self.audio_player = None
+        # "scheduler" sleeps until the next fire time, "polling" checks every 30 seconds
+        self.mode = mode
+        self._wakeup = threading.Condition()
+        # Polling mode fires the table entries between consecutive checks
+        self._last_check = None
+        super().__init__(db, max_sleep, mode)
 
-class AlarmMonitor:
-    def __init__(self, db: AlarmDatabase):
-        self.db = db
-        self.audio_player = AudioPlayer()
-        self.is_running = False
-        self.triggered_today = set()  # Track alarms triggered today to avoid duplicates
-        
     def start_monitoring(self):
         """Start monitoring alarms in background"""
         self.is_running = True
-        
+        self.warm_up_audio()
+
+        if self.mode == "scheduler":
+            self._run_scheduler()
+            return
+
         while self.is_running:
             try:
                 self.check_alarms()
@@ -24,47 +42,109 @@ class AlarmMonitor:
             except Exception as e:
                 print(f"Error in alarm monitoring: {e}")
                 time.sleep(60)  # Wait longer if there's an error
-    
+
     def stop_monitoring(self):
         """Stop monitoring alarms"""
         self.is_running = False
-    
+        with self._wakeup:
+            self._wakeup.notify_all()
+        # Make sure every queued trigger reaches the history table
+        self.history_writer.close()
+
+    def notify_change(self):
+        """Wake the scheduler so it reloads the alarm set"""
+        with self._wakeup:
+            self._schedule_dirty = True
+            self._wakeup.notify_all()
+
+    def notify_timers(self):
+        """Wake the scheduler so it picks up new timers"""
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _now(self) -> datetime.datetime:
+        """Current time, aware in UTC"""
+        if self.clock is not None:
+            return self.clock.now()
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    def _run_scheduler(self):
+        """Sleep until the earliest fire time or a change, then trigger due alarms"""
+        while self.is_running:
+            began = time.perf_counter()
+            try:
+                with self._wakeup:
+                    now = self._now()
+                    timeout = self._wait_timeout(now, self._prepare(now))
+                    if timeout is not None:
+                        self._check_duration.observe(time.perf_counter() - began)
+                        self._wakeup.wait(timeout)
+                        continue
+                    due, due_timers = self._pop_due(now)
+
+                # Trigger outside the lock so changes are never blocked on playback
+                self._fire(due, due_timers)
+                self._check_duration.observe(time.perf_counter() - began)
+            except Exception as e:
+                print(f"Error in alarm monitoring: {e}")
+                with self._wakeup:
+                    self._schedule_dirty = True
+                    self._wakeup.wait(60)  # Wait longer if there's an error
+
     def check_alarms(self):
         """Check if any alarms should trigger now"""
-        now = datetime.datetime.now()
-        current_time = now.strftime("%H:%M")
-        current_weekday = now.strftime('%A').lower()
-        today_key = now.strftime("%Y-%m-%d")
-        
-        # Reset triggered alarms at midnight
-        if now.hour == 0 and now.minute == 0:
-            self.triggered_today.clear()
-        
-        active_alarms = self.db.get_active_alarms()
-        
-        for alarm in active_alarms:
-            # Check if this alarm should trigger now
-            if (alarm['time'] == current_time and 
-                current_weekday in alarm['days']):
-                
-                # Create unique key for this alarm today
-                alarm_key = f"{alarm['id']}_{today_key}"
-                
-                # Only trigger if not already triggered today
-                if alarm_key not in self.triggered_today:
-                    self.trigger_alarm(alarm)
-                    self.triggered_today.add(alarm_key)
-    
-    def trigger_alarm(self, alarm: Dict):
-        """Trigger an alarm - play sound and log"""
+        began = time.perf_counter()
+        now = self._now()
+        self._roll_day(utc_to_local(now, None).date())
+
+        # Fire instants passed since the last check, starting with this minute
+        if self._last_check is None:
+            self._last_check = now.replace(second=0, microsecond=0) - datetime.timedelta(microseconds=1)
+        due_alarms = self.db.get_due_alarms(max(self._last_check, now - datetime.timedelta(days=1)), now)
+        self._last_check = now
+
+        # An alarm missed several times (e.g. during suspend) fires once
+        fired = set()
+        for trigger_time, alarm in due_alarms:
+            if alarm.id not in fired:
+                fired.add(alarm.id)
+                self._trigger_once(alarm, trigger_time)
+
+        self._silence_snoozed(self.timers.load_new())
+        for timer in self.timers.pop_due(now):
+            self.trigger_timer(timer)
+        self._check_duration.observe(time.perf_counter() - began)
+
+    def _notify_alarm(self, alarm: Alarm, trigger_time: datetime.datetime):
+        """Print the alarm and play its sound"""
+        print(f"🔔 Triggering alarm: {alarm.name} at {alarm.time}")
+        if self.audio:
+            self._get_audio_player().play_alarm_sound(alarm_id=alarm.id, sound_name=alarm.sound)
+
+    def _notify_timer(self, timer: Timer):
+        """Print the timer and play its sound"""
+        print(f"⏲️ Timer fired: {timer.label}")
+        if self.audio:
+            self._get_audio_player().play_alarm_sound(alarm_id=timer.alarm_id,
+                                                      sound_name=timer_sound(self.db, timer))
+
+    def warm_up_audio(self):
+        """Open the audio device and load the default sound so no trigger pays for it"""
+        if not self.audio:
+            return
         try:
-            print(f"🔔 Triggering alarm: {alarm['name']} at {alarm['time']}")
-            
-            # Log the alarm trigger
-            self.db.log_alarm_trigger(alarm['id'], alarm['name'])
-            
-            # Play alarm sound
-            self.audio_player.play_alarm_sound()
-            
+            self._get_audio_player().init_mixer()
         except Exception as e:
-            print(f"Error triggering alarm {alarm['name']}: {e}")
+            print(f"Error initializing audio: {e}")
+
+    def _stop_sound(self, alarm_id: Optional[int]):
+        """Stop an alarm's playback if the player exists"""
+        if self.audio_player is not None:
+            self.audio_player.stop_alarm(alarm_id)
+
+    def _get_audio_player(self):
+        """The audio player, imported and created on first use"""
+        if self.audio_player is None:
+            from audio_player import AudioPlayer
+            self.audio_player = AudioPlayer(sound_bank=self.db.sound_bank)
+        return self.audio_player
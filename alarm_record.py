@@ -0,0 +1,81 @@
+import datetime
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from scheduler import mask_to_days
+
+
+@dataclass(frozen=True, slots=True)
+class Alarm:
+    """Compact, immutable alarm row: weekdays as a 7-bit mask, time as minute of day
+
+    `timezone` is an IANA zone name the wall-clock time is read in; None
+    means the system local zone. `sound` names the alarm's clip in the sound
+    bank (a preset or custom tone); None plays the default sound.
+    """
+    id: int
+    name: str
+    minute_of_day: int
+    days_mask: int
+    is_active: bool
+    created_at: str
+    timezone: Optional[str] = None
+    sound: Optional[str] = None
+
+    @property
+    def time(self) -> str:
+        """The alarm time as "HH:MM" """
+        return f"{self.minute_of_day // 60:02d}:{self.minute_of_day % 60:02d}"
+
+    @property
+    def days(self) -> List[str]:
+        """The alarm weekdays as names"""
+        return mask_to_days(self.days_mask)
+
+    def to_dict(self) -> Dict:
+        """The dict shape returned by the AlarmDatabase dict API"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'time': self.time,
+            'days': self.days,
+            'is_active': self.is_active,
+            'created_at': self.created_at,
+            'days_mask': self.days_mask,
+            'minute_of_day': self.minute_of_day,
+            'timezone': self.timezone,
+            'sound': self.sound
+        }
+
+
+# "countdown" timers run for a duration, "oneshot" ones fire once at a set
+# time and "snooze" ones re-fire an alarm that was put off
+TIMER_KINDS = ("oneshot", "snooze", "countdown")
+
+
+@dataclass(frozen=True, slots=True)
+class Timer:
+    """A pending one-shot, snooze or countdown timer
+
+    `fire_at` is UTC epoch seconds; `alarm_id` is set on snoozes only.
+    """
+    id: int
+    kind: str
+    label: str
+    fire_at: float
+    alarm_id: Optional[int] = None
+
+    @property
+    def fire_time(self) -> datetime.datetime:
+        """When the timer fires, aware in UTC"""
+        return datetime.datetime.fromtimestamp(self.fire_at, datetime.timezone.utc)
+
+
+def alarm_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Alarm:
+    """sqlite3 row factory building an Alarm from an ALARM_COLUMNS row"""
+    return Alarm(row[0], row[1], row[6], row[3], bool(row[4]), row[5], row[7], row[8])
+
+
+def timer_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Timer:
+    """sqlite3 row factory building a Timer from a TIMER_COLUMNS row"""
+    return Timer(*row)
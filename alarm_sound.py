@@ -1,93 +1,211 @@
 import numpy as np
 import wave
 import tempfile
-import os
+import io
+from typing import Dict, Iterator, NamedTuple, Optional, Sequence, Tuple
+from sound_bank import CUSTOM_TONE_PREFIX, CUSTOM_TONE_RANGE
+
+
+class Beep(NamedTuple):
+    """One tone in a beep pattern; times are in seconds"""
+    frequency: float
+    start: float
+    duration: float
+    fade: float = 0.0  # Linear attack/release applied to this beep only
+
+
+# Classic pattern: 800Hz, 1000Hz, 800Hz beeps of 0.3s every 0.5s
+DEFAULT_PATTERN = (
+    Beep(800, 0.0, 0.3),
+    Beep(1000, 0.5, 0.3),
+    Beep(800, 1.0, 0.3),
+)
+
+# Named sounds an alarm can choose; custom_tone() names a custom two-beep tone
+SOUND_PRESETS: Dict[str, Tuple[Beep, ...]] = {
+    'classic': DEFAULT_PATTERN,
+    'gentle': (
+        Beep(523, 0.0, 0.6, fade=0.15),
+        Beep(659, 0.7, 0.6, fade=0.15),
+        Beep(784, 1.4, 0.5, fade=0.15),
+    ),
+    'urgent': tuple(Beep(1400, start / 8, 0.08) for start in range(0, 16, 2)),
+    'chime': (
+        Beep(1047, 0.0, 0.9, fade=0.3),
+        Beep(784, 0.9, 1.0, fade=0.4),
+    ),
+}
+
+
+def sound_pattern(name: str) -> Tuple[Beep, ...]:
+    """Beep pattern of a preset or custom tone name; raises ValueError for unknown names"""
+    if name in SOUND_PRESETS:
+        return SOUND_PRESETS[name]
+    if name.startswith(CUSTOM_TONE_PREFIX):
+        frequency = int(name[len(CUSTOM_TONE_PREFIX):])
+        low, high = CUSTOM_TONE_RANGE
+        if not low <= frequency <= high:
+            raise ValueError(f"tone frequency must be within {low}-{high} Hz")
+        return (Beep(frequency, 0.0, 0.4, fade=0.02), Beep(frequency, 0.6, 0.4, fade=0.02))
+    raise ValueError(f"unknown alarm sound {name!r}")
+
+
+def _apply_fades(signal: np.ndarray, fade_samples: int):
+    """Apply linear fade-in and fade-out ramps in place"""
+    fade_samples = min(fade_samples, len(signal) // 2)
+    if fade_samples <= 0:
+        return
+    ramp = np.arange(fade_samples) / fade_samples
+    signal[:fade_samples] *= ramp
+    signal[-fade_samples:] *= ramp[::-1] + 1 / fade_samples
+
+
+def _fade_gain(positions: np.ndarray, length: int, fade_samples: int) -> np.ndarray:
+    """Linear fade-in/fade-out gain at sample positions within a span of `length` samples"""
+    fade_samples = min(fade_samples, length // 2)
+    if fade_samples <= 0:
+        return np.ones(len(positions))
+    return np.minimum(1.0, np.minimum(positions, length - positions) / fade_samples)
+
 
 class AlarmSoundGenerator:
     def __init__(self):
         self.sample_rate = 22050
         self.duration = 2.0  # Duration of each alarm beep
+        self.pattern = DEFAULT_PATTERN
     
     def generate_alarm_sound(self) -> str:
         """Generate a simple alarm sound and return the file path"""
         try:
-            # Create a temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            temp_file.close()
-            
-            # Generate alarm sound - classic beeping pattern
-            t = np.linspace(0, self.duration, int(self.sample_rate * self.duration))
-            
-            # Create a beeping pattern: 800Hz for 0.5s, silence for 0.5s, repeat
-            frequency1 = 800  # Primary frequency
-            frequency2 = 1000  # Secondary frequency for variation
-            
-            # Generate the waveform
-            wave1 = np.sin(2 * np.pi * frequency1 * t)
-            wave2 = np.sin(2 * np.pi * frequency2 * t)
-            
-            # Create beeping pattern
-            beep_pattern = np.zeros_like(t)
-            
-            # First beep (0.0 - 0.3s)
-            mask1 = (t >= 0.0) & (t < 0.3)
-            beep_pattern[mask1] = wave1[mask1]
-            
-            # Second beep (0.5 - 0.8s)
-            mask2 = (t >= 0.5) & (t < 0.8)
-            beep_pattern[mask2] = wave2[mask2]
-            
-            # Third beep (1.0 - 1.3s)
-            mask3 = (t >= 1.0) & (t < 1.3)
-            beep_pattern[mask3] = wave1[mask3]
-            
-            # Apply envelope to avoid clicks
-            envelope = np.ones_like(beep_pattern)
-            fade_samples = int(0.01 * self.sample_rate)  # 10ms fade
-            
-            for i in range(len(envelope)):
-                if i < fade_samples:
-                    envelope[i] = i / fade_samples
-                elif i > len(envelope) - fade_samples:
-                    envelope[i] = (len(envelope) - i) / fade_samples
-            
-            beep_pattern *= envelope
-            
-            # Normalize and convert to 16-bit
-            beep_pattern = np.clip(beep_pattern * 0.3, -1.0, 1.0)  # Reduce volume
-            audio_data = (beep_pattern * 32767).astype(np.int16)
-            
-            # Write to WAV file
-            with wave.open(temp_file.name, 'w') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(self.sample_rate)
-                wav_file.writeframes(audio_data.tobytes())
-            
-            return temp_file.name
-            
+            return self._write_temp_wav(self.render_alarm_sound())
         except Exception as e:
             print(f"Error generating alarm sound: {e}")
             return None
-    
+
+    def render_alarm_sound(self) -> np.ndarray:
+        """Synthesize the alarm beep pattern as mono 16-bit samples"""
+        return self.render_pattern(self.pattern)
+
+    def render_sound(self, name: str) -> np.ndarray:
+        """Synthesize a preset or custom tone (see SOUND_PRESETS) as mono 16-bit samples"""
+        return self.render_pattern(sound_pattern(name))
+
+    def render_pattern(self, pattern: Sequence[Beep], duration: Optional[float] = None,
+                       sample_rate: Optional[int] = None, fade: float = 0.01,
+                       volume: float = 0.3) -> np.ndarray:
+        """Synthesize a beep pattern as mono 16-bit samples
+
+        Each beep is generated only over its own sample range, and the
+        click-avoiding fades are applied as array ramps.
+        """
+        duration = self.duration if duration is None else duration
+        sample_rate = self.sample_rate if sample_rate is None else sample_rate
+        n_samples = int(sample_rate * duration)
+        signal = np.zeros(n_samples)
+
+        for beep in pattern:
+            start = min(n_samples, int(np.ceil(beep.start * sample_rate)))
+            stop = min(n_samples, int(np.ceil((beep.start + beep.duration) * sample_rate)))
+            if stop <= start:
+                continue
+
+            t = np.arange(start, stop) / sample_rate
+            segment = np.sin(2 * np.pi * beep.frequency * t)
+            _apply_fades(segment, int(beep.fade * sample_rate))
+            signal[start:stop] = segment
+
+        # Fade the whole clip in and out to avoid clicks at the loop point
+        _apply_fades(signal, int(fade * sample_rate))
+
+        # Normalize and convert to 16-bit
+        signal = np.clip(signal * volume, -1.0, 1.0)
+        return (signal * 32767).astype(np.int16)
+
+    def stream_alarm_sound(self, duration: float, chunk_duration: float = 0.5,
+                           pattern: Optional[Sequence[Beep]] = None, period: Optional[float] = None,
+                           sample_rate: Optional[int] = None, fade: float = 0.01,
+                           start_volume: float = 0.3, end_volume: Optional[float] = None,
+                           frequency_step: float = 0.0) -> Iterator[np.ndarray]:
+        """Yield an alarm of any length as fixed-size mono 16-bit chunks
+
+        The pattern repeats every `period` seconds. Volume ramps linearly from
+        `start_volume` to `end_volume` and each repetition raises every beep by
+        `frequency_step` Hz, so long escalating alarms never need the whole
+        waveform in memory.
+        """
+        pattern = self.pattern if pattern is None else pattern
+        period = self.duration if period is None else period
+        sample_rate = self.sample_rate if sample_rate is None else sample_rate
+        end_volume = start_volume if end_volume is None else end_volume
+
+        total_samples = int(sample_rate * duration)
+        chunk_samples = max(1, int(sample_rate * chunk_duration))
+        fade_samples = int(fade * sample_rate)
+
+        for chunk_start in range(0, total_samples, chunk_samples):
+            chunk_stop = min(total_samples, chunk_start + chunk_samples)
+            signal = np.zeros(chunk_stop - chunk_start)
+
+            # Every repetition of the pattern that overlaps this chunk
+            first_cycle = int(chunk_start / sample_rate // period)
+            last_cycle = int((chunk_stop - 1) / sample_rate // period)
+            for cycle in range(first_cycle, last_cycle + 1):
+                for beep in pattern:
+                    beep_time = cycle * period + beep.start
+                    beep_start = int(np.ceil(beep_time * sample_rate))
+                    beep_stop = int(np.ceil((beep_time + beep.duration) * sample_rate))
+                    start = max(beep_start, chunk_start)
+                    stop = min(beep_stop, chunk_stop)
+                    if stop <= start:
+                        continue
+
+                    positions = np.arange(start, stop)
+                    frequency = beep.frequency + cycle * frequency_step
+                    segment = np.sin(2 * np.pi * frequency * positions / sample_rate)
+                    segment *= _fade_gain(positions - beep_start, beep_stop - beep_start,
+                                          int(beep.fade * sample_rate))
+                    signal[start - chunk_start:stop - chunk_start] = segment
+
+            positions = np.arange(chunk_start, chunk_stop)
+            signal *= _fade_gain(positions, total_samples, fade_samples)
+            signal *= start_volume + (end_volume - start_volume) * positions / total_samples
+
+            yield (np.clip(signal, -1.0, 1.0) * 32767).astype(np.int16)
+
     def generate_simple_tone(self, frequency: int = 800) -> str:
         """Generate a simple tone as fallback"""
         try:
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            temp_file.close()
-            
-            t = np.linspace(0, 1.0, int(self.sample_rate * 1.0))
-            wave_data = np.sin(2 * np.pi * frequency * t) * 0.3
-            audio_data = (wave_data * 32767).astype(np.int16)
-            
-            with wave.open(temp_file.name, 'w') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(self.sample_rate)
-                wav_file.writeframes(audio_data.tobytes())
-            
-            return temp_file.name
-            
+            return self._write_temp_wav(self.render_simple_tone(frequency))
         except Exception as e:
             print(f"Error generating simple tone: {e}")
             return None
+
+    def render_simple_tone(self, frequency: int = 800) -> np.ndarray:
+        """Synthesize a one-second tone as mono 16-bit samples"""
+        t = np.linspace(0, 1.0, int(self.sample_rate * 1.0))
+        wave_data = np.sin(2 * np.pi * frequency * t) * 0.3
+        return (wave_data * 32767).astype(np.int16)
+
+    def to_wav_bytes(self, audio_data: np.ndarray) -> bytes:
+        """Encode mono 16-bit samples as an in-memory WAV file"""
+        buffer = io.BytesIO()
+        self._write_wav(buffer, audio_data)
+        return buffer.getvalue()
+
+    def _write_wav(self, target, audio_data: np.ndarray):
+        """Write mono 16-bit samples as WAV to a path or file object"""
+        with wave.open(target, 'wb') as wav_file:
+            wav_file.setnchannels(1)  # Mono
+            wav_file.setsampwidth(2)  # 16-bit
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(audio_data.tobytes())
+
+    def _write_temp_wav(self, audio_data: Optional[np.ndarray]) -> Optional[str]:
+        """Write samples to a temporary WAV file and return its path"""
+        if audio_data is None:
+            return None
+
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
+        temp_file.close()
+        self._write_wav(temp_file.name, audio_data)
+        return temp_file.name
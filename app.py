@@ -1,20 +1,131 @@
 import streamlit as st
-import pandas as pd
 import datetime
-import time
 from database import AlarmDatabase
-from alarm_monitor import AlarmMonitor
-import threading
+import subprocess
+import sys
+import os
+from typing import Optional
+from zoneinfo import available_timezones
+from monitor_daemon import fetch_monitor_metrics, is_monitor_running, notify_monitor, notify_monitor_timers
+from metrics import METRICS, histogram_quantile, render_prometheus
+from sound_bank import CUSTOM_TONE_PREFIX, CUSTOM_TONE_RANGE, DEFAULT_SOUND, custom_tone
+
+DAY_LABELS = {
+    'monday': "Lunes",
+    'tuesday': "Martes",
+    'wednesday': "Miércoles",
+    'thursday': "Jueves",
+    'friday': "Viernes",
+    'saturday': "Sábado",
+    'sunday': "Domingo"
+}
+PAGE_SIZES = [25, 50, 100, 250]
+# Sound choices; "custom" becomes a custom_tone() name from the frequency input
+SOUND_LABELS = {
+    DEFAULT_SOUND: "Clásico (predeterminado)",
+    'gentle': "Suave",
+    'urgent': "Urgente",
+    'chime': "Campanilla",
+    'custom': "Tono personalizado",
+}
+
+
+def sound_choice(choice, frequency) -> Optional[str]:
+    """Sound name stored for a SOUND_LABELS choice (None keeps the default)"""
+    if choice == 'custom':
+        return custom_tone(frequency)
+    return None if choice == DEFAULT_SOUND else choice
+
+
+def sound_label(sound) -> str:
+    """Display text of an alarm's sound"""
+    if sound and sound.startswith(CUSTOM_TONE_PREFIX):
+        return f"Tono {sound[len(CUSTOM_TONE_PREFIX):]} Hz"
+    return SOUND_LABELS.get(sound or DEFAULT_SOUND, sound)
+
+
+@st.cache_resource(show_spinner=False)
+def get_alarm_db() -> AlarmDatabase:
+    """One database (and connection pool) shared by every browser session"""
+    db = AlarmDatabase()
+    # Let the monitor daemon reschedule as soon as this process changes alarms
+    db.add_change_listener(notify_monitor)
+    db.add_timer_listener(notify_monitor_timers)
+    return db
+
+
+@st.cache_resource(show_spinner=False)
+def ensure_monitor_daemon():
+    """Start the shared monitor process once per server if none is running"""
+    if is_monitor_running():
+        return None
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "monitor_daemon.py")
+    # The daemon refuses to start twice, so racing servers are harmless
+    return subprocess.Popen([sys.executable, script], start_new_session=True)
+
+
+@st.cache_data(ttl=1, show_spinner=False)
+def load_data_versions(_db: AlarmDatabase) -> dict:
+    """Change counters, read at most once per second across all sessions"""
+    return _db.get_data_versions()
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_alarms_page(_db: AlarmDatabase, alarms_version: int, after, limit: int,
+                     search: str, active, day):
+    """One page of the alarm list, memoized until the alarms change"""
+    return _db.get_alarms_page(after, limit, search or None, active, day)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_alarm_count(_db: AlarmDatabase, alarms_version: int, search: str = "",
+                     active=None, day=None) -> int:
+    """Number of alarms matching the list filters, memoized until the alarms change"""
+    return _db.count_alarms(search or None, active, day)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_next_alarm(_db: AlarmDatabase, alarms_version: int, minute: str):
+    """Next alarm, memoized per alarm version and clock minute"""
+    return _db.get_next_alarm()
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_recent_history(_db: AlarmDatabase, history_version: int) -> list:
+    """Recent triggers, memoized until the history changes"""
+    return _db.get_recent_triggered_alarms()
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_timers(_db: AlarmDatabase, timers_version: int) -> list:
+    """Pending timers, memoized until a timer is created, cancelled or fired"""
+    return _db.get_timers()
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def load_monitor_metrics() -> Optional[dict]:
+    """Monitor daemon metrics, fetched at most every 5 seconds across all sessions"""
+    return fetch_monitor_metrics()
+
+
+@st.cache_data(show_spinner=False)
+def load_timezones() -> list:
+    """IANA zone names offered when creating an alarm"""
+    return sorted(available_timezones())
+
+
+def refresh_after_change():
+    """Rerun with fresh data right after this session changed something"""
+    load_data_versions.clear()
+    st.rerun()
+
 
 # Initialize session state
 if 'alarm_db' not in st.session_state:
-    st.session_state.alarm_db = AlarmDatabase()
+    st.session_state.alarm_db = get_alarm_db()
 
-if 'alarm_monitor' not in st.session_state:
-    st.session_state.alarm_monitor = AlarmMonitor(st.session_state.alarm_db)
-    # Start monitoring in background
-    monitor_thread = threading.Thread(target=st.session_state.alarm_monitor.start_monitoring, daemon=True)
-    monitor_thread.start()
+# Scheduling and playback live in one monitor process shared by all sessions
+ensure_monitor_daemon()
 
 # Page configuration
 st.set_page_config(
@@ -35,6 +146,18 @@ with st.sidebar:
         
         # Time input
         alarm_time = st.time_input("Hora", value=datetime.time(8, 0))
+
+        # None keeps the alarm on the machine's local time
+        alarm_timezone = st.selectbox(
+            "Zona horaria", [None] + load_timezones(),
+            format_func=lambda zone: "Hora local" if zone is None else zone
+        )
+
+        # Rendered into the shared sound bank when the alarm is created
+        alarm_sound = st.selectbox("Sonido", list(SOUND_LABELS), format_func=SOUND_LABELS.get)
+        tone_frequency = st.number_input("Frecuencia del tono personalizado (Hz)",
+                                         min_value=CUSTOM_TONE_RANGE[0], max_value=CUSTOM_TONE_RANGE[1],
+                                         value=880, step=10)
         
         # Days selection
         st.write("Días de la semana:")
@@ -60,97 +183,315 @@ with st.sidebar:
                 success = st.session_state.alarm_db.create_alarm(
                     name=alarm_name.strip(),
                     time=alarm_time,
-                    days=selected_days
+                    days=selected_days,
+                    timezone=alarm_timezone,
+                    sound=sound_choice(alarm_sound, tone_frequency)
                 )
                 if success:
                     st.success("¡Alarma creada exitosamente!")
-                    st.rerun()
+                    refresh_after_change()
                 else:
                     st.error("Error al crear la alarma")
 
+    st.header("⏲️ Temporizadores")
+
+    with st.form("countdown_form"):
+        countdown_label = st.text_input("Nombre", value="Temporizador")
+        countdown_minutes, countdown_seconds = st.columns(2)
+        minutes = countdown_minutes.number_input("Minutos", min_value=0, max_value=1440, value=5)
+        seconds = countdown_seconds.number_input("Segundos", min_value=0, max_value=59, value=0)
+        if st.form_submit_button("Iniciar cuenta atrás"):
+            if minutes * 60 + seconds <= 0:
+                st.error("Por favor, indique una duración")
+            elif st.session_state.alarm_db.create_countdown(
+                    countdown_label.strip() or "Temporizador", minutes * 60 + seconds) is not None:
+                refresh_after_change()
+            else:
+                st.error("Error al crear el temporizador")
+
+    with st.form("oneshot_form"):
+        oneshot_label = st.text_input("Nombre", value="Recordatorio")
+        oneshot_date = st.date_input("Fecha", value=datetime.date.today(), format="DD/MM/YYYY")
+        oneshot_time = st.time_input("Hora", value=datetime.time(8, 0), key="oneshot_time")
+        if st.form_submit_button("Crear alarma única"):
+            # Naive, so it is read in the machine's local time
+            fire_time = datetime.datetime.combine(oneshot_date, oneshot_time)
+            if fire_time <= datetime.datetime.now():
+                st.error("Por favor, elija una hora futura")
+            elif st.session_state.alarm_db.create_timer(oneshot_label.strip() or "Recordatorio",
+                                                        fire_time) is not None:
+                refresh_after_change()
+            else:
+                st.error("Error al crear la alarma única")
+
+# Versions this run renders; the clock fragment reruns the app when they move
+data_versions = load_data_versions(st.session_state.alarm_db)
+st.session_state.rendered_versions = data_versions
+
 # Main content area
 col1, col2 = st.columns([2, 1])
 
 with col1:
     st.header("📋 Mis Alarmas")
-    
-    # Get all alarms
-    alarms = st.session_state.alarm_db.get_all_alarms()
-    
-    if not alarms:
-        st.info("No hay alarmas configuradas. Crea tu primera alarma usando el panel lateral.")
+
+    # Filters; only one page of alarms is loaded and rendered at a time
+    filter_search, filter_state, filter_day, filter_size = st.columns([2, 1, 1, 1])
+    search = filter_search.text_input("Buscar por nombre", key="alarm_search").strip()
+    state = filter_state.selectbox("Estado", ["Todas", "Activas", "Inactivas"], key="alarm_state")
+    day = filter_day.selectbox(
+        "Día", [None] + list(DAY_LABELS),
+        format_func=lambda d: "Todos" if d is None else DAY_LABELS[d],
+        key="alarm_day"
+    )
+    page_size = filter_size.selectbox("Por página", PAGE_SIZES, index=1, key="alarm_page_size")
+    active = {"Activas": True, "Inactivas": False}.get(state)
+
+    # Keyset cursors of the pages visited so far; reset when the filters change
+    filters = (search, active, day, page_size)
+    if st.session_state.get('alarm_filters') != filters:
+        st.session_state.alarm_filters = filters
+        st.session_state.page_cursors = [None]
+    page_cursors = st.session_state.page_cursors
+
+    alarms_version = data_versions.get('alarms', 0)
+    alarms, next_cursor = load_alarms_page(
+        st.session_state.alarm_db, alarms_version, page_cursors[-1], page_size, search, active, day
+    )
+    total_alarms = load_alarm_count(st.session_state.alarm_db, alarms_version, search, active, day)
+
+    if not total_alarms:
+        if search or active is not None or day:
+            st.info("Ninguna alarma coincide con los filtros.")
+        else:
+            st.info("No hay alarmas configuradas. Crea tu primera alarma usando el panel lateral.")
     else:
-        # Display alarms
-        for alarm in alarms:
-            with st.container():
-                col_info, col_toggle, col_delete = st.columns([3, 1, 1])
-                
-                with col_info:
-                    status_icon = "🟢" if alarm['is_active'] else "🔴"
-                    days_str = ", ".join([day.capitalize() for day in alarm['days']])
-                    st.write(f"{status_icon} **{alarm['name']}** - {alarm['time']} - {days_str}")
-                
-                with col_toggle:
-                    if st.button("Activar" if not alarm['is_active'] else "Desactivar", 
-                               key=f"toggle_{alarm['id']}"):
-                        st.session_state.alarm_db.toggle_alarm(alarm['id'])
-                        st.rerun()
-                
-                with col_delete:
-                    if st.button("🗑️", key=f"delete_{alarm['id']}", help="Eliminar alarma"):
-                        st.session_state.alarm_db.delete_alarm(alarm['id'])
-                        st.rerun()
-                
-                st.divider()
+        # Display alarms (pandas is only loaded once there is a table to show)
+        import pandas as pd
+        table = pd.DataFrame({
+            "Estado": ["🟢" if alarm['is_active'] else "🔴" for alarm in alarms],
+            "Nombre": [alarm['name'] for alarm in alarms],
+            "Hora": [alarm['time'] for alarm in alarms],
+            "Días": [", ".join(DAY_LABELS[d] for d in alarm['days']) for alarm in alarms],
+            "Zona": [alarm['timezone'] or "Local" for alarm in alarms],
+            "Sonido": [sound_label(alarm['sound']) for alarm in alarms],
+        })
+        selection = st.dataframe(
+            table,
+            hide_index=True,
+            width="stretch",
+            on_select="rerun",
+            selection_mode="multi-row",
+            # A new key per page and data version, so a stale selection never
+            # points at rows that moved after a change or a filter
+            key=f"alarm_table_{alarms_version}_{len(page_cursors)}_{filters}"
+        )
+        selected_ids = [alarms[row]['id'] for row in selection.selection.rows if row < len(alarms)]
+
+        # Bulk actions on the selected rows
+        action_on, action_off, action_snooze, action_delete = st.columns(4)
+        if action_on.button("Activar", disabled=not selected_ids, width="stretch"):
+            st.session_state.alarm_db.toggle_alarms_bulk(selected_ids, active=True)
+            refresh_after_change()
+        if action_off.button("Desactivar", disabled=not selected_ids, width="stretch"):
+            st.session_state.alarm_db.toggle_alarms_bulk(selected_ids, active=False)
+            refresh_after_change()
+        if action_snooze.button("😴 Posponer 5 min", disabled=not selected_ids, width="stretch"):
+            for alarm_id in selected_ids:
+                st.session_state.alarm_db.snooze_alarm(alarm_id)
+            refresh_after_change()
+        if action_delete.button("🗑️ Eliminar", disabled=not selected_ids, width="stretch"):
+            st.session_state.alarm_db.delete_alarms_bulk(selected_ids)
+            refresh_after_change()
+
+        # Change the sound of the selected rows
+        sound_select, sound_tone, sound_apply = st.columns([2, 1, 1], vertical_alignment="bottom")
+        new_sound = sound_select.selectbox("Sonido", list(SOUND_LABELS), format_func=SOUND_LABELS.get,
+                                           key="bulk_sound")
+        new_tone = sound_tone.number_input("Hz", min_value=CUSTOM_TONE_RANGE[0],
+                                           max_value=CUSTOM_TONE_RANGE[1], value=880, step=10,
+                                           key="bulk_tone", disabled=new_sound != 'custom')
+        if sound_apply.button("🎵 Cambiar sonido", disabled=not selected_ids, width="stretch"):
+            st.session_state.alarm_db.set_alarms_sound_bulk(selected_ids, sound_choice(new_sound, new_tone))
+            refresh_after_change()
+
+        # Page navigation
+        nav_prev, nav_info, nav_next = st.columns([1, 2, 1])
+        if nav_prev.button("◀ Anterior", disabled=len(page_cursors) == 1, width="stretch"):
+            page_cursors.pop()
+            st.rerun()
+        nav_info.caption(f"Página {len(page_cursors)} · {total_alarms} alarmas")
+        if nav_next.button("Siguiente ▶", disabled=next_cursor is None, width="stretch"):
+            page_cursors.append(next_cursor)
+            st.rerun()
+
+@st.fragment(run_every=1)
+def system_status():
+    """Live clock and next alarm; only this fragment ticks every second"""
+    # Rerun the whole app only when another session or the monitor changed
+    # what it shows; timers refresh in their own fragment
+    versions = load_data_versions(st.session_state.alarm_db)
+    if any(versions.get(name) != st.session_state.rendered_versions.get(name)
+           for name in ('alarms', 'history')):
+        st.rerun(scope="app")
 
-with col2:
-    st.header("⏱️ Estado del Sistema")
-    
     # Current time display
     current_time = datetime.datetime.now()
     st.metric("Hora Actual", current_time.strftime("%H:%M:%S"))
     st.metric("Fecha", current_time.strftime("%d/%m/%Y"))
     
     # Active alarms count
-    active_alarms = len([a for a in alarms if a['is_active']])
+    active_alarms = load_alarm_count(
+        st.session_state.alarm_db, st.session_state.rendered_versions.get('alarms', 0), active=True
+    )
     st.metric("Alarmas Activas", active_alarms)
     
     # Next alarm info
-    next_alarm = st.session_state.alarm_db.get_next_alarm()
+    next_alarm = load_next_alarm(
+        st.session_state.alarm_db,
+        st.session_state.rendered_versions.get('alarms', 0),
+        current_time.strftime("%Y-%m-%d %H:%M")
+    )
     if next_alarm:
         st.write("**Próxima Alarma:**")
         st.write(f"📌 {next_alarm['name']}")
         next_time = next_alarm['next_trigger']
         if next_time:
-            st.write(f"🕐 {next_time.strftime('%A, %d/%m/%Y a las %H:%M')}")
+            zone = f" ({next_alarm['timezone']})" if next_alarm['timezone'] else ""
+            st.write(f"🕐 {next_time.strftime('%A, %d/%m/%Y a las %H:%M')}{zone}")
     else:
         st.write("**Próxima Alarma:**")
         st.write("No hay alarmas activas")
 
-# Recent alarms section
-st.header("🔔 Historial Reciente")
-recent_alarms = st.session_state.alarm_db.get_recent_triggered_alarms()
 
-if recent_alarms:
-    for alarm in recent_alarms:
-        trigger_time = datetime.datetime.fromisoformat(alarm['triggered_at'])
-        time_ago = datetime.datetime.now() - trigger_time
-        
-        if time_ago.days > 0:
-            time_str = f"hace {time_ago.days} días"
-        elif time_ago.seconds > 3600:
-            hours = time_ago.seconds // 3600
-            time_str = f"hace {hours} horas"
-        elif time_ago.seconds > 60:
-            minutes = time_ago.seconds // 60
-            time_str = f"hace {minutes} minutos"
-        else:
-            time_str = "hace menos de un minuto"
-        
-        st.write(f"🔔 **{alarm['name']}** sonó {time_str}")
-else:
-    st.info("No hay alarmas recientes")
+TIMER_KIND_ICONS = {'countdown': "⏳", 'oneshot': "📅", 'snooze': "😴"}
+
+
+def cancel_timer(timer_id: int):
+    """Cancel a timer and drop the cached versions so the list updates at once"""
+    st.session_state.alarm_db.cancel_timer(timer_id)
+    load_data_versions.clear()
+
+
+@st.fragment(run_every=1)
+def pending_timers():
+    """Pending timers with a live countdown and a cancel button each"""
+    # Shares the once-per-second version read, so ticking runs no timer query
+    timers_version = load_data_versions(st.session_state.alarm_db).get('timers', 0)
+    timers = load_timers(st.session_state.alarm_db, timers_version)
+    if not timers:
+        st.caption("No hay temporizadores pendientes")
+        return
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for timer in timers:
+        remaining = max(0, int((timer.fire_time - now).total_seconds()))
+        hours, rest = divmod(remaining, 3600)
+        info, cancel = st.columns([4, 1])
+        info.write(f"{TIMER_KIND_ICONS.get(timer.kind, '⏲️')} **{timer.label}** · "
+                   f"{hours}:{rest // 60:02d}:{rest % 60:02d}")
+        # As a callback, so the cancelled timer is gone from the rerun it triggers
+        cancel.button("✖", key=f"cancel_timer_{timer.id}", help="Cancelar",
+                      on_click=cancel_timer, args=(timer.id,))
+
+
+@st.fragment(run_every=60)
+def recent_history():
+    """Recent triggers; re-rendered each minute so relative times stay current"""
+    recent_alarms = load_recent_history(
+        st.session_state.alarm_db, st.session_state.rendered_versions.get('history', 0)
+    )
 
-# Auto-refresh every 30 seconds
-time.sleep(1)
-st.rerun()
+    if recent_alarms:
+        for alarm in recent_alarms:
+            trigger_time = datetime.datetime.fromisoformat(alarm['triggered_at'])
+            time_ago = datetime.datetime.now() - trigger_time
+            
+            if time_ago.days > 0:
+                time_str = f"hace {time_ago.days} días"
+            elif time_ago.seconds > 3600:
+                hours = time_ago.seconds // 3600
+                time_str = f"hace {hours} horas"
+            elif time_ago.seconds > 60:
+                minutes = time_ago.seconds // 60
+                time_str = f"hace {minutes} minutos"
+            else:
+                time_str = "hace menos de un minuto"
+            
+            st.write(f"🔔 **{alarm['name']}** sonó {time_str}")
+    else:
+        st.info("No hay alarmas recientes")
+
+
+def format_seconds(value) -> str:
+    """Short latency text for the diagnostics panel"""
+    if value is None:
+        return "—"
+    if abs(value) < 1:
+        return f"{value * 1000:.1f} ms"
+    return f"{value:.2f} s"
+
+
+def metric_samples(snapshot: dict, name: str) -> list:
+    """Samples of one metric in a snapshot, or [] if it was never recorded"""
+    return snapshot.get(name, {}).get('samples', [])
+
+
+@st.fragment(run_every=5)
+def diagnostics():
+    """Monitor and database metrics, refreshed from the daemon every 5 seconds"""
+    monitor = load_monitor_metrics()
+    if monitor is None:
+        st.caption("El monitor no responde; solo se muestran las consultas de esta interfaz.")
+        monitor = {}
+
+    lateness = metric_samples(monitor, "alarm_trigger_lateness_seconds")
+    # The daemon runs a single mode; show whichever one has been checking
+    checks = max(metric_samples(monitor, "alarm_check_duration_seconds"),
+                 key=lambda sample: sample['count'], default=None)
+    pending = metric_samples(monitor, "audio_playback_pending")
+    active = metric_samples(monitor, "audio_playback_active")
+
+    late_col, check_col, queue_col = st.columns(3)
+    late_col.metric("Retraso p95", format_seconds(histogram_quantile(lateness[0], 0.95)) if lateness else "—",
+                    help="Hora real menos hora programada de cada disparo")
+    check_col.metric("Verificación p95", format_seconds(histogram_quantile(checks, 0.95)) if checks else "—")
+    queue_col.metric("Cola de audio", f"{pending[0]['value']:.0f}" if pending else "0",
+                     help="Reproducciones esperando un canal")
+    triggers = metric_samples(monitor, "alarm_triggers_total")
+    sounding = f"{active[0]['value']:.0f}" if active else "0"
+    st.caption(f"Disparos: {triggers[0]['value']:.0f} · Sonando: {sounding}" if triggers else f"Sonando: {sounding}")
+
+    synthesis = metric_samples(monitor, "sound_generation_seconds")
+    if synthesis:
+        st.caption("Síntesis de sonido: " + ", ".join(
+            f"{sample['labels']['kind']} {format_seconds(sample['sum'] / sample['count'])}"
+            for sample in synthesis if sample['count']
+        ))
+
+    rows = {"Proceso": [], "Método": [], "Consultas": [], "Media": [], "p95": []}
+    for source, snapshot in (("Monitor", monitor), ("Interfaz", METRICS.snapshot())):
+        for sample in metric_samples(snapshot, "db_query_duration_seconds"):
+            if sample['count']:
+                rows["Proceso"].append(source)
+                rows["Método"].append(sample['labels']['method'])
+                rows["Consultas"].append(sample['count'])
+                rows["Media"].append(format_seconds(sample['sum'] / sample['count']))
+                rows["p95"].append(format_seconds(histogram_quantile(sample, 0.95)))
+    if rows["Método"]:
+        st.dataframe(rows, hide_index=True, width="stretch")
+
+    if monitor:
+        st.download_button("Descargar métricas (Prometheus)", render_prometheus(monitor),
+                           file_name="alarm_metrics.prom", mime="text/plain")
+
+
+with col2:
+    st.header("⏱️ Estado del Sistema")
+    system_status()
+    st.subheader("⏲️ Temporizadores")
+    pending_timers()
+    with st.expander("🩺 Diagnóstico"):
+        diagnostics()
+
+# Recent alarms section
+st.header("🔔 Historial Reciente")
+recent_history()
@@ -0,0 +1,164 @@
+import asyncio
+import datetime
+import time
+from typing import List, Optional
+from database import AlarmDatabase
+from alarm_record import Alarm, Timer
+from occurrence_engine import as_utc, utc_to_local
+from notification_sinks import AudioSink, ConsoleSink, NotificationSink, SinkDispatcher, TriggerEvent
+from monitor_core import MonitorCore, timer_sound
+
+
+class SystemClock:
+    """The real clock"""
+
+    def now(self) -> datetime.datetime:
+        """Current time, aware in UTC"""
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    async def wait(self, event: asyncio.Event, timeout: float):
+        """Wait until `event` is set or `timeout` seconds have passed"""
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+class FakeClock:
+    """Virtual clock for simulations: waiting jumps straight to the end of the timeout"""
+
+    def __init__(self, start: datetime.datetime):
+        self._now = as_utc(start)
+
+    def now(self) -> datetime.datetime:
+        """Current virtual time, aware in UTC"""
+        return self._now
+
+    def advance(self, seconds: float):
+        """Move virtual time forward"""
+        self._now += datetime.timedelta(seconds=seconds)
+
+    async def wait(self, event: asyncio.Event, timeout: float):
+        """Let other tasks run, then advance by `timeout` unless `event` was set"""
+        await asyncio.sleep(0)
+        if not event.is_set():
+            self.advance(timeout)
+
+
+class AsyncAlarmMonitor(MonitorCore):
+    """Alarm monitor on asyncio that fans each trigger out to notification sinks
+
+    Exposes the same start_monitoring/stop_monitoring/notify_change interface
+    as AlarmMonitor, so it can run in the monitor daemon's thread. Sinks are
+    dispatched through a SinkDispatcher, so a slow sink never delays other
+    alarms firing in the same minute.
+    """
+
+    def __init__(self, db: AlarmDatabase, sinks: Optional[List[NotificationSink]] = None,
+                 clock=None, max_sleep: float = 60.0, drain_timeout: float = 5.0):
+        self.clock = clock or SystemClock()
+        self.sinks = sinks if sinks is not None else [ConsoleSink(), AudioSink(sound_bank=db.sound_bank)]
+        self.dispatcher = SinkDispatcher(self.sinks)
+        # How long sinks get to deliver queued triggers on shutdown
+        self.drain_timeout = drain_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+        super().__init__(db, max_sleep, "asyncio")
+
+    def start_monitoring(self):
+        """Run the monitor on a new event loop until stop_monitoring() is called"""
+        self.warm_up_audio()
+        asyncio.run(self.run())
+
+    def warm_up_audio(self):
+        """Get the audio sinks ready so no trigger pays for loading pygame or the default sound"""
+        for sink in self.sinks:
+            if isinstance(sink, AudioSink):
+                try:
+                    sink.warm_up()
+                except Exception as e:
+                    print(f"Error initializing audio: {e}")
+
+    def stop_monitoring(self):
+        """Stop monitoring alarms (safe to call from any thread)"""
+        self.is_running = False
+        self._wake()
+
+    def notify_change(self):
+        """Wake the monitor so it reloads the alarm set (safe to call from any thread)"""
+        self._schedule_dirty = True
+        self._wake()
+
+    def notify_timers(self):
+        """Wake the monitor so it picks up new timers (safe to call from any thread)"""
+        self._wake()
+
+    def _wake(self):
+        """Set the change event from whichever thread we are called on"""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._changed.set)
+
+    def _now(self) -> datetime.datetime:
+        """Current time on the monitor's clock, aware in UTC"""
+        return self.clock.now()
+
+    async def run(self, until: Optional[datetime.datetime] = None):
+        """Monitor until stopped, or until the clock reaches `until` (for simulations)"""
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        self.is_running = True
+        self.dispatcher.start()
+        try:
+            while self.is_running:
+                self._changed.clear()
+                now = self.clock.now()
+                if until is not None and now >= until:
+                    break
+                try:
+                    await self._step(now, until)
+                except Exception as e:
+                    print(f"Error in alarm monitoring: {e}")
+                    self._schedule_dirty = True
+                    await self.clock.wait(self._changed, 60)  # Wait longer if there's an error
+        finally:
+            self.is_running = False
+            await self.dispatcher.close(self.drain_timeout)
+            # Make sure every queued trigger reaches the history table
+            self.history_writer.close()
+            self._loop = None
+
+    async def _step(self, now: datetime.datetime, until: Optional[datetime.datetime]):
+        """Reschedule if needed, then wait for the next deadline or fire what is due"""
+        began = time.perf_counter()
+        timeout = self._wait_timeout(now, self._prepare(now))
+        if timeout is not None:
+            if until is not None:
+                timeout = min(timeout, (until - now).total_seconds())
+            self._check_duration.observe(time.perf_counter() - began)
+            await self.clock.wait(self._changed, timeout)
+            return
+
+        self._fire(*self._pop_due(now))
+        self._check_duration.observe(time.perf_counter() - began)
+        # Let the sink workers pick up what was just queued
+        await asyncio.sleep(0)
+
+    def _notify_alarm(self, alarm: Alarm, trigger_time: datetime.datetime):
+        """Hand the trigger to every sink without waiting on them"""
+        self.dispatcher.dispatch(
+            TriggerEvent(alarm.id, alarm.name, alarm.time, alarm.timezone, trigger_time, alarm.sound)
+        )
+
+    def _notify_timer(self, timer: Timer):
+        """Hand a timer firing to every sink"""
+        self.dispatcher.dispatch(TriggerEvent(
+            timer.alarm_id, timer.label, utc_to_local(timer.fire_time, None).strftime("%H:%M:%S"),
+            None, timer.fire_time, timer_sound(self.db, timer)
+        ))
+
+    def _stop_sound(self, alarm_id: Optional[int]):
+        """Stop an alarm's playback on every audio sink that has a player"""
+        for sink in self.sinks:
+            if isinstance(sink, AudioSink) and sink.audio_player is not None:
+                sink.audio_player.stop_alarm(alarm_id)
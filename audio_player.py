@@ -1,75 +1,302 @@
 import pygame
 import threading
 import time
-import os
+import heapq
+import itertools
+from typing import Dict, Iterator, List, Optional
 from alarm_sound import AlarmSoundGenerator
+from sound_cache import SoundCache
+from sound_bank import DEFAULT_SOUND, SoundBank
+from metrics import METRICS
+
+_PENDING = METRICS.gauge("audio_playback_pending", "Playbacks waiting for a mixer channel")
+_ACTIVE = METRICS.gauge("audio_playback_active", "Playbacks currently sounding")
+
+
+class PlaybackHandle:
+    """One alarm's playback: either a looping cached sound or a stream of chunks"""
+
+    def __init__(self, alarm_id: Optional[int], priority: int, duration: float,
+                 sound: Optional[pygame.mixer.Sound] = None,
+                 chunks: Optional[Iterator] = None, chunk_duration: float = 0.5):
+        self.alarm_id = alarm_id
+        self.priority = priority
+        self.duration = duration
+        self.sound = sound
+        self.chunks = chunks
+        self.chunk_duration = chunk_duration
+        self.requested_at = time.perf_counter()
+        self.start_latency: Optional[float] = None
+        self.channel: Optional[pygame.mixer.Channel] = None
+        self.channel_index: Optional[int] = None
+        self.stopped = False
+        self.finished = threading.Event()
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the handle is playing or still waiting for a channel"""
+        return not self.finished.is_set()
+
+    def stop(self):
+        """Ask the mixer thread to stop this playback"""
+        self.stopped = True
+
 
 class AudioPlayer:
-    def __init__(self):
+    def __init__(self, max_concurrent: int = 4, sound_bank: Optional[SoundBank] = None):
         self.sound_generator = AlarmSoundGenerator()
-        self.is_playing = False
-        
-        # Initialize pygame mixer
-        try:
-            pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-        except Exception as e:
-            print(f"Error initializing audio: {e}")
-    
-    def play_alarm_sound(self, duration: int = 30):
-        """Play alarm sound for specified duration (seconds)"""
-        if self.is_playing:
-            return
-        
+        # Per-alarm sounds are played from the shared sound bank when given one
+        self.sound_cache = SoundCache(self.sound_generator, sound_bank)
+        # Seconds from play_alarm_sound() to the first sample being queued
+        self.last_start_latency: Optional[float] = None
+
+        # Alarms sounding at once; each gets its own mixer channel and all
+        # of them are driven by a single mixer thread
+        self.max_concurrent = max_concurrent
+        self._free_channels = list(range(max_concurrent))
+        self._active: List[PlaybackHandle] = []
+        self._pending: List = []  # Heap of (-priority, sequence, handle)
+        self._sequence = itertools.count()
+        self._wakeup = threading.Condition()
+        self._mixer_thread: Optional[threading.Thread] = None
+        self._channels_ready = False
+        # The audio device is opened by init_mixer() or the first playback,
+        # not here, so constructing a player costs nothing
+        self._mixer_attempted = False
+        self._init_lock = threading.Lock()
+
+    def init_mixer(self) -> bool:
+        """Open the audio device and render the cached sounds; returns whether audio works
+
+        Called by the first playback; call it earlier to take the cost up front.
+        """
+        with self._init_lock:
+            if not self._mixer_attempted:
+                self._mixer_attempted = True
+                try:
+                    # Mono at the bank's rate, so bank clips play straight from their mmap slices
+                    pygame.mixer.init(frequency=22050, size=-16, channels=1, buffer=512)
+                    pygame.mixer.set_num_channels(self.max_concurrent)
+                    self._channels_ready = True
+                    # Load sounds now so later triggers never wait on loading or synthesis
+                    self.sound_cache.warm_up()
+                except Exception as e:
+                    print(f"Error initializing audio: {e}")
+        return self._channels_ready
+
+    @property
+    def is_playing(self) -> bool:
+        """Whether any alarm is currently sounding or waiting for a channel"""
+        with self._wakeup:
+            return bool(self._active or self._pending)
+
+    @property
+    def active_handles(self) -> Dict[Optional[int], PlaybackHandle]:
+        """Currently sounding playbacks by alarm id"""
+        with self._wakeup:
+            return {handle.alarm_id: handle for handle in self._active}
+
+    def play_alarm_sound(self, duration: int = 30, alarm_id: Optional[int] = None,
+                         priority: int = 0, sound_name: Optional[str] = None) -> Optional[PlaybackHandle]:
+        """Play alarm sound for specified duration (seconds)
+
+        `sound_name` picks a sound bank clip (the alarm's sound); None plays
+        the default one.
+        """
         try:
-            # Generate alarm sound
-            sound_file = self.sound_generator.generate_alarm_sound()
-            
-            if sound_file and os.path.exists(sound_file):
-                # Start playing in a separate thread
-                play_thread = threading.Thread(
-                    target=self._play_sound_thread,
-                    args=(sound_file, duration),
-                    daemon=True
-                )
-                play_thread.start()
-            else:
+            if not self.init_mixer():
+                print("Audio is not available")
+                return None
+
+            sound = self.sound_cache.get_clip(sound_name or DEFAULT_SOUND)
+            if sound is None and sound_name:
+                sound = self.sound_cache.get_clip(DEFAULT_SOUND)
+            if sound is None:
+                # No sound bank, or alarms saved before it existed
+                sound = self.sound_cache.get("alarm")
+            if sound is None:
+                # Fall back to the plain tone if the beep pattern failed
+                sound = self.sound_cache.get("tone", 800)
+
+            if sound is None:
                 print("Could not generate alarm sound")
-                
+                return None
+
+            return self._submit(PlaybackHandle(alarm_id, priority, duration, sound=sound))
+
         except Exception as e:
             print(f"Error playing alarm sound: {e}")
-    
-    def _play_sound_thread(self, sound_file: str, duration: int):
-        """Play sound in a separate thread"""
+            return None
+
+    def play_alarm_stream(self, duration: int = 300, chunk_duration: float = 0.5,
+                          alarm_id: Optional[int] = None, priority: int = 0,
+                          **stream_options) -> Optional[PlaybackHandle]:
+        """Play a long or escalating alarm, synthesized chunk by chunk during playback
+
+        Extra keyword arguments go to AlarmSoundGenerator.stream_alarm_sound
+        (e.g. end_volume, frequency_step).
+        """
         try:
-            self.is_playing = True
-            sound = pygame.mixer.Sound(sound_file)
-            
-            # Play for specified duration
-            start_time = time.time()
-            while time.time() - start_time < duration:
-                sound.play()
-                time.sleep(1)  # Play every second
-                
-                # Check if we should stop
-                if not self.is_playing:
-                    break
-            
-            self.is_playing = False
-            
-            # Clean up temporary file
-            try:
-                os.remove(sound_file)
-            except:
-                pass
-                
+            frequency = pygame.mixer.get_init()[0] if self.init_mixer() else None
+            chunks = self.sound_generator.stream_alarm_sound(
+                duration, chunk_duration=chunk_duration, sample_rate=frequency, **stream_options
+            )
+            return self._submit(PlaybackHandle(alarm_id, priority, duration,
+                                               chunks=chunks, chunk_duration=chunk_duration))
         except Exception as e:
-            print(f"Error in sound playing thread: {e}")
-            self.is_playing = False
-    
-    def stop_alarm(self):
-        """Stop currently playing alarm"""
-        self.is_playing = False
+            print(f"Error playing alarm stream: {e}")
+            return None
+
+    def _submit(self, handle: PlaybackHandle) -> Optional[PlaybackHandle]:
+        """Queue a playback for the mixer thread, starting the thread if needed"""
+        if not self._channels_ready:
+            print("Audio is not available")
+            return None
+
+        with self._wakeup:
+            # A re-trigger of an alarm that is already sounding returns its handle
+            if handle.alarm_id is not None:
+                for other in self._active + [entry[2] for entry in self._pending]:
+                    if other.alarm_id == handle.alarm_id and not other.stopped:
+                        return other
+
+            heapq.heappush(self._pending, (-handle.priority, next(self._sequence), handle))
+            self._update_gauges()
+            if self._mixer_thread is None:
+                self._mixer_thread = threading.Thread(target=self._mixer_loop, daemon=True)
+                self._mixer_thread.start()
+            self._wakeup.notify_all()
+        return handle
+
+    def _mixer_loop(self):
+        """Single thread driving every playback; exits once idle"""
+        while True:
+            with self._wakeup:
+                self._schedule_pending()
+                if not self._active:
+                    if not self._pending:
+                        self._wakeup.wait(5.0)
+                        if not self._active and not self._pending:
+                            # Idle: the next submit starts a fresh thread
+                            self._mixer_thread = None
+                            return
+                    continue
+                handles = list(self._active)
+
+            tick = 0.25
+            for handle in handles:
+                try:
+                    done = self._service(handle)
+                except Exception as e:
+                    print(f"Error in sound playing thread: {e}")
+                    done = True
+                if done:
+                    self._release(handle)
+                elif handle.chunks is not None:
+                    tick = min(tick, handle.chunk_duration / 4)
+
+            with self._wakeup:
+                self._wakeup.wait(tick)
+
+    def _schedule_pending(self):
+        """Start pending playbacks by priority, preempting lower-priority ones when full"""
+        while self._pending:
+            _, _, handle = self._pending[0]
+            if handle.stopped:
+                heapq.heappop(self._pending)
+                handle.finished.set()
+                continue
+
+            if not self._free_channels:
+                lowest = min(self._active, key=lambda h: h.priority)
+                if lowest.priority >= handle.priority:
+                    break
+                self._stop_channel(lowest)
+                self._active.remove(lowest)
+                lowest.finished.set()
+
+            heapq.heappop(self._pending)
+            handle.channel_index = self._free_channels.pop()
+            handle.channel = pygame.mixer.Channel(handle.channel_index)
+            self._active.append(handle)
+            self._start(handle)
+        self._update_gauges()
+
+    def _update_gauges(self):
+        """Publish the playback queue depth (caller holds the lock)"""
+        _PENDING.set(len(self._pending))
+        _ACTIVE.set(len(self._active))
+
+    def _start(self, handle: PlaybackHandle):
+        """Begin playback of a handle on its channel"""
+        if handle.sound is not None:
+            # Loop the cached clip until the duration elapses
+            handle.channel.play(handle.sound, loops=-1, maxtime=int(handle.duration * 1000))
+        else:
+            first_chunk = next(handle.chunks, None)
+            if first_chunk is not None:
+                handle.channel.play(self._chunk_to_sound(first_chunk))
+
+        handle.start_latency = time.perf_counter() - handle.requested_at
+        self.last_start_latency = handle.start_latency
+
+    def _service(self, handle: PlaybackHandle) -> bool:
+        """Keep a playback fed; return True once it has finished"""
+        if handle.stopped:
+            return True
+
+        if handle.chunks is not None and handle.channel.get_queue() is None:
+            # The channel holds one queued sound; keep one chunk ahead
+            chunk = next(handle.chunks, None)
+            if chunk is None:
+                handle.chunks = None
+            else:
+                handle.channel.queue(self._chunk_to_sound(chunk))
+                return False
+
+        return not handle.channel.get_busy()
+
+    def _release(self, handle: PlaybackHandle):
+        """Stop a playback and return its channel to the pool"""
+        with self._wakeup:
+            if handle not in self._active:
+                return
+            self._stop_channel(handle)
+            self._active.remove(handle)
+            handle.finished.set()
+            self._update_gauges()
+            self._wakeup.notify_all()
+
+    def _stop_channel(self, handle: PlaybackHandle):
+        """Silence a handle's channel and free it (caller holds the lock)"""
         try:
-            pygame.mixer.stop()
-        except:
+            handle.channel.stop()
+        except Exception:
             pass
+        self._free_channels.append(handle.channel_index)
+
+    def _chunk_to_sound(self, chunk) -> pygame.mixer.Sound:
+        """Wrap a mono int16 chunk as a Sound in the mixer's channel layout"""
+        channels = pygame.mixer.get_init()[2]
+        if channels > 1:
+            chunk = chunk.repeat(channels)
+        return pygame.mixer.Sound(buffer=chunk.tobytes())
+
+    def stop_alarm(self, alarm_id: Optional[int] = None):
+        """Stop one alarm's playback, or every playback when no id is given"""
+        with self._wakeup:
+            for handle in self._active + [entry[2] for entry in self._pending]:
+                if alarm_id is None or handle.alarm_id == alarm_id:
+                    handle.stop()
+
+            # Drop stopped requests that never got a channel
+            still_pending = []
+            for entry in self._pending:
+                if entry[2].stopped:
+                    entry[2].finished.set()
+                else:
+                    still_pending.append(entry)
+            heapq.heapify(still_pending)
+            self._pending = still_pending
+            self._update_gauges()
+            self._wakeup.notify_all()
@@ -0,0 +1,23 @@
+"""Helpers shared by the benchmark scripts (import after the repo root is on sys.path)"""
+import random
+from typing import List, Optional
+
+from database import AlarmDatabase
+from scheduler import WEEKDAYS
+
+
+def seed(db: AlarmDatabase, count: int, days: Optional[List[str]] = None, seed: int = 42):
+    """Create `count` active alarms at reproducible random times
+
+    Every alarm fires on `days`; without it each gets a random set of one to
+    seven weekdays.
+    """
+    rng = random.Random(seed)
+    db.create_alarms_bulk(
+        {
+            'name': f"alarm {i}",
+            'time': f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+            'days': list(days) if days is not None else rng.sample(WEEKDAYS, rng.randint(1, 7)),
+        }
+        for i in range(count)
+    )
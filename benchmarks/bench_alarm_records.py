@@ -0,0 +1,64 @@
+"""Compare loading alarms from SQLite as per-row dicts vs slotted Alarm records
+
+Usage: python benchmarks/bench_alarm_records.py [--alarms N] [--repeat N]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from _common import seed  # noqa: E402
+from database import AlarmDatabase  # noqa: E402
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def retained_bytes(fn) -> int:
+    """Memory still held by the result of fn() once it returns"""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alarms", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = AlarmDatabase(os.path.join(tmp, "bench.db"))
+        seed(db, args.alarms)
+
+        # Read the table itself: the public getters are served by the alarm
+        # cache after their first call, so they would only time cache hits
+        loaders = [
+            ("dicts", lambda: [alarm.to_dict() for alarm in db._load_alarm_records()]),
+            ("records", db._load_alarm_records),
+        ]
+        print(f"{'loader':>8} {'load ms':>10} {'retained MB':>12} {'bytes/alarm':>12}")
+        for label, loader in loaders:
+            load_t = best_of(loader, args.repeat)
+            size = retained_bytes(loader)
+            print(f"{label:>8} {load_t * 1e3:>10.1f} {size / 1e6:>12.1f} {size / args.alarms:>12.0f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare AlarmDatabase ops/sec: per-call sqlite3.connect vs the connection pool
+
+Usage: python benchmarks/bench_connection_pool.py [--alarms N] [--ops N]
+"""
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from database import AlarmDatabase  # noqa: E402
+
+DAYS = ['monday', 'wednesday', 'friday']
+
+
+def per_call_get_active(db_path: str):
+    """The pre-pool read path: a fresh connection per call"""
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute('''
+            SELECT id, name, time, days, is_active, created_at
+            FROM alarms WHERE is_active = 1 ORDER BY time
+        ''').fetchall()
+        return [json.loads(row[3]) for row in rows]
+
+
+def per_call_log(db_path: str, alarm_id: int):
+    """The pre-pool write path: a fresh connection and commit per call"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('INSERT INTO alarm_history (alarm_id, alarm_name) VALUES (?, ?)',
+                     (alarm_id, 'bench'))
+        conn.commit()
+
+
+def ops_per_sec(fn, ops: int) -> float:
+    start = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    return ops / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alarms", type=int, default=50)
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        db = AlarmDatabase(db_path)
+        for i in range(args.alarms):
+            db.create_alarm(f"alarm {i}", datetime.time(i % 24, i % 60), DAYS)
+
+        results = {
+            "read_per_call_connect": ops_per_sec(lambda i: per_call_get_active(db_path), args.ops),
+            "read_pooled": ops_per_sec(lambda i: db.get_active_alarms(), args.ops),
+            "write_per_call_connect": ops_per_sec(lambda i: per_call_log(db_path, i), args.ops),
+            "write_pooled": ops_per_sec(lambda i: db.log_alarm_trigger(i, 'bench'), args.ops),
+        }
+        db.close()
+
+    for name, value in results.items():
+        print(f"{name:<24} {value:>12,.0f} ops/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Check import time of the headless entry points against a budget
+
+Each module is imported in a fresh interpreter under `python -X importtime`
+(best of --repeat runs) and must stay within its budget and must not load
+audio, synthesis or UI dependencies (pygame, numpy, pandas, streamlit).
+A last check constructs an AlarmDatabase and two AlarmMonitors, one headless
+and one with audio, and makes sure that still loads none of them: the mixer
+is only opened by the first trigger. Exits with status 1 when a check fails,
+so it can gate a release.
+
+Usage: python benchmarks/bench_import_time.py [--repeat 5] [--budget-scale 1.0]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Cumulative import time budgets in milliseconds
+BUDGETS_MS = {
+    'database': 60,
+    'alarm_io': 60,
+    'alarm_monitor': 60,
+    'monitor_daemon': 60,
+    'async_monitor': 120,
+}
+HEAVY_MODULES = ("pygame", "numpy", "pandas", "streamlit")
+
+MONITOR_STARTUP = """
+import os, sys
+from database import AlarmDatabase
+from alarm_monitor import AlarmMonitor
+db = AlarmDatabase(os.path.join(sys.argv[1], "alarms.db"))
+headless = AlarmMonitor(db, audio=False)
+with_audio = AlarmMonitor(db)
+db.close()
+print(",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def import_time_ms(module: str) -> tuple:
+    """Cumulative import time of `module` and the heavy modules it loaded"""
+    code = f"import sys, {module}; print(','.join(n for n in {HEAVY_MODULES!r} if n in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative = None
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1]) / 1000
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return cumulative, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="Multiply every budget, e.g. 2 on a slow machine")
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'module':>16} {'best ms':>9} {'budget ms':>10}  heavy modules")
+    for module, budget in BUDGETS_MS.items():
+        budget *= args.budget_scale
+        runs = [import_time_ms(module) for _ in range(args.repeat)]
+        best = min(ms for ms, _ in runs)
+        loaded = sorted({name for _, names in runs for name in names})
+        ok = best <= budget and not loaded
+        failures += not ok
+        print(f"{module:>16} {best:>9.1f} {budget:>10.0f}  {', '.join(loaded) or '-'}"
+              f"{'' if ok else '  FAIL'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = subprocess.run(
+            [sys.executable, "-c", MONITOR_STARTUP.format(heavy=HEAVY_MODULES), tmp],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    failures += bool(loaded)
+    print(f"AlarmMonitor startup loaded: {', '.join(loaded) or '-'}{'  FAIL' if loaded else ''}")
+
+    if failures:
+        print(f"{failures} check(s) over budget")
+        sys.exit(1)
+    print("all import budgets met")
+
+
+if __name__ == "__main__":
+    main()
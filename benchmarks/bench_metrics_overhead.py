@@ -0,0 +1,68 @@
+"""Measure what the always-on metrics cost
+
+Times Histogram.observe() on its own and with 8 threads contending for it,
+then compares the cheapest instrumented AlarmDatabase query
+(get_data_versions) with the same call made without its timing wrapper.
+
+Usage: python benchmarks/bench_metrics_overhead.py [--calls 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from database import AlarmDatabase  # noqa: E402
+from metrics import Histogram  # noqa: E402
+
+
+def per_call(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+
+def contended_observe(calls: int, threads: int) -> float:
+    """Seconds per observe() with `threads` threads sharing one histogram"""
+    histogram = Histogram()
+
+    def work():
+        for _ in range(calls // threads):
+            histogram.observe(0.001)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    histogram = Histogram()
+    print(f"observe():                 {per_call(lambda: histogram.observe(0.001), args.calls) * 1e9:8.0f} ns")
+    print(f"observe(), 8 threads:      {contended_observe(args.calls, 8) * 1e9:8.0f} ns")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = AlarmDatabase(os.path.join(tmp, "alarms.db"))
+        untimed = AlarmDatabase.get_data_versions.__wrapped__
+        calls = args.calls // 10
+        raw = per_call(lambda: untimed(db), calls)
+        timed = per_call(db.get_data_versions, calls)
+        db.close()
+    print(f"get_data_versions raw:     {raw * 1e6:8.2f} us")
+    print(f"get_data_versions timed:   {timed * 1e6:8.2f} us  (+{(timed - raw) * 1e6:.2f} us, "
+          f"{(timed - raw) / raw:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
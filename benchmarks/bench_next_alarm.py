@@ -0,0 +1,96 @@
+"""Compare the per-alarm get_next_alarm loop with lookups in a precomputed FireTable
+
+Usage: python benchmarks/bench_next_alarm.py [--sizes 10000 100000] [--repeat N]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from alarm_record import Alarm  # noqa: E402
+from occurrence_engine import FIRE_TABLE_WINDOW, FireTable  # noqa: E402
+from scheduler import WEEKDAY_MAP, WEEKDAYS, days_to_mask  # noqa: E402
+
+
+def make_alarms(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    alarms = []
+    for i in range(count):
+        minute = rng.randrange(1440)
+        days = rng.sample(WEEKDAYS, rng.randint(1, 7))
+        alarms.append(Alarm(i, f"alarm {i}", minute, days_to_mask(days), True, ""))
+    return alarms
+
+
+def dict_next_occurrence(alarm, after):
+    """The original per-dict next occurrence: strptime over the day names"""
+    alarm_time = datetime.datetime.strptime(alarm['time'], "%H:%M").time()
+    next_trigger_time = None
+    for day in alarm['days']:
+        days_ahead = WEEKDAY_MAP[day] - after.weekday()
+        if days_ahead < 0:
+            days_ahead += 7
+        elif days_ahead == 0 and after.time() >= alarm_time:
+            days_ahead = 7
+        trigger_time = datetime.datetime.combine(
+            after.date() + datetime.timedelta(days=days_ahead), alarm_time
+        )
+        if next_trigger_time is None or trigger_time < next_trigger_time:
+            next_trigger_time = trigger_time
+    return next_trigger_time
+
+
+def loop_next_alarm(alarms, now):
+    """The original nested alarms x days loop over dict rows"""
+    next_alarm = None
+    next_trigger_time = None
+    for alarm in alarms:
+        trigger_time = dict_next_occurrence(alarm, now)
+        if next_trigger_time is None or trigger_time < next_trigger_time:
+            next_trigger_time = trigger_time
+            next_alarm = alarm
+    return next_trigger_time, next_alarm
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    now = datetime.datetime.now()
+    now_utc = now.astimezone(datetime.timezone.utc)
+    print(f"{'alarms':>8} {'loop ms':>10} {'build ms':>10} {'next ms':>10} {'next 10 ms':>11} {'24h window ms':>14}")
+    for size in args.sizes:
+        alarms = make_alarms(size)
+        rows = [alarm.to_dict() for alarm in alarms]
+        table = FireTable(alarms, now_utc, now_utc + FIRE_TABLE_WINDOW)
+        expected = loop_next_alarm(rows, now)[0].astimezone(datetime.timezone.utc)
+        assert table.next_after(now_utc)[0][0] == expected
+
+        loop_t = best_of(lambda: loop_next_alarm(rows, now), args.repeat)
+        build_t = best_of(lambda: FireTable(alarms, now_utc, now_utc + FIRE_TABLE_WINDOW), args.repeat)
+        next_t = best_of(lambda: table.next_after(now_utc), args.repeat)
+        next10_t = best_of(lambda: table.next_after(now_utc, 10), args.repeat)
+        window_t = best_of(
+            lambda: table.firings_between(now_utc, now_utc + datetime.timedelta(hours=24)), args.repeat
+        )
+        print(f"{size:>8} {loop_t * 1e3:>10.2f} {build_t * 1e3:>10.2f} {next_t * 1e3:>10.3f} "
+              f"{next10_t * 1e3:>11.3f} {window_t * 1e3:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
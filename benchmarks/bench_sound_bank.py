@@ -0,0 +1,76 @@
+"""Time-to-playable of an alarm sound: shared sound bank against rendering per trigger
+
+"render" is the path every process took before the bank: synthesize the
+pattern with NumPy, encode it as WAV and load it into pygame. "bank" reads
+the pre-rendered clip as a slice of the memory-mapped bank file and hands it
+to pygame as-is. A fresh SoundBank is opened per round for the bank path so
+the mapping and index read are part of the timing, like a monitor process
+that has never played that sound. The one-off render into the bank (paid
+when an alarm is created or edited) is reported separately.
+
+Usage: python benchmarks/bench_sound_bank.py [--rounds 200] [--sound classic]
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from alarm_sound import AlarmSoundGenerator  # noqa: E402
+from sound_bank import SoundBank  # noqa: E402
+
+
+def measure(fn, rounds: int):
+    """Median and p95 milliseconds of `rounds` calls"""
+    samples = []
+    for _ in range(rounds):
+        began = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - began) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--sound", default="classic", help="Preset or tone:<Hz> name")
+    args = parser.parse_args()
+
+    generator = AlarmSoundGenerator()
+    pygame.mixer.init(frequency=generator.sample_rate, size=-16, channels=1, buffer=512)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sounds")
+        began = time.perf_counter()
+        SoundBank(path).ensure(args.sound, generator)
+        ensure_ms = (time.perf_counter() - began) * 1000
+
+        def render():
+            wav = generator.to_wav_bytes(generator.render_sound(args.sound))
+            return pygame.mixer.Sound(file=io.BytesIO(wav))
+
+        def bank():
+            clip_bank = SoundBank(path)
+            sound = pygame.mixer.Sound(buffer=clip_bank.clip(args.sound))
+            clip_bank.close()
+            return sound
+
+        print(f"{args.sound}: {os.path.getsize(path):,} byte bank, first render into it {ensure_ms:.1f} ms")
+        print(f"{'':8}{'median':>10}{'p95':>10}")
+        for name, fn in (("render", render), ("bank", bank)):
+            median, p95 = measure(fn, args.rounds)
+            print(f"{name:8}{median:7.2f} ms{p95:7.2f} ms")
+
+    pygame.mixer.quit()
+
+
+if __name__ == "__main__":
+    main()
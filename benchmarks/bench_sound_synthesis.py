@@ -0,0 +1,83 @@
+"""Micro-benchmark alarm sound synthesis time as the clip duration grows
+
+Compares the original per-sample envelope loop with the vectorized
+AlarmSoundGenerator.render_pattern pipeline.
+
+Usage: python benchmarks/bench_sound_synthesis.py [--durations 2 10 30 120] [--sample-rate 22050]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from alarm_sound import AlarmSoundGenerator, Beep  # noqa: E402
+
+
+def legacy_render(duration: float, sample_rate: int, pattern) -> np.ndarray:
+    """The original full-length sine arrays, masks and Python envelope loop"""
+    t = np.linspace(0, duration, int(sample_rate * duration))
+    beep_pattern = np.zeros_like(t)
+    for beep in pattern:
+        wave_data = np.sin(2 * np.pi * beep.frequency * t)
+        mask = (t >= beep.start) & (t < beep.start + beep.duration)
+        beep_pattern[mask] = wave_data[mask]
+
+    envelope = np.ones_like(beep_pattern)
+    fade_samples = int(0.01 * sample_rate)
+    for i in range(len(envelope)):
+        if i < fade_samples:
+            envelope[i] = i / fade_samples
+        elif i > len(envelope) - fade_samples:
+            envelope[i] = (len(envelope) - i) / fade_samples
+    beep_pattern *= envelope
+
+    beep_pattern = np.clip(beep_pattern * 0.3, -1.0, 1.0)
+    return (beep_pattern * 32767).astype(np.int16)
+
+
+def repeating_pattern(duration: float):
+    """The default three-beep pattern repeated every 2 seconds"""
+    pattern = []
+    offset = 0.0
+    while offset < duration:
+        pattern += [Beep(800, offset, 0.3), Beep(1000, offset + 0.5, 0.3), Beep(800, offset + 1.0, 0.3)]
+        offset += 2.0
+    return pattern
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--durations", type=float, nargs="+", default=[2, 10, 30, 120])
+    parser.add_argument("--sample-rate", type=int, default=22050)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    generator = AlarmSoundGenerator()
+    print(f"{'seconds':>8} {'samples':>10} {'legacy ms':>10} {'vectorized ms':>14} {'speedup':>8}")
+    for duration in args.durations:
+        pattern = repeating_pattern(duration)
+        legacy_t = best_of(lambda: legacy_render(duration, args.sample_rate, pattern), args.repeat)
+        new_t = best_of(
+            lambda: generator.render_pattern(pattern, duration=duration, sample_rate=args.sample_rate),
+            args.repeat
+        )
+        samples = int(duration * args.sample_rate)
+        print(f"{duration:>8g} {samples:>10} {legacy_t * 1e3:>10.2f} {new_t * 1e3:>14.2f} "
+              f"{legacy_t / new_t:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
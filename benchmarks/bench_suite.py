@@ -0,0 +1,240 @@
+"""Simulated-clock benchmark suite for the whole alarm pipeline, emitting JSON
+
+For each database size it seeds a fresh temporary database with that many
+daily alarms and measures, on a FakeClock that starts at local midnight:
+
+- check_loop: one polling check_alarms() call every 30 virtual seconds, and
+  one scheduler step (next_deadline + pop_due) per virtual minute
+- trigger_to_log: AlarmMonitor.trigger_alarm() until its history row is committed
+- get_next_alarm: with the alarm cache cold and warm
+- ui_fetch: the queries one Streamlit rerun makes (versions, first page,
+  count, next alarm, recent history), cold and warm
+
+Sound generation is measured once, independent of size. Audio goes through
+pygame's dummy driver, so the suite runs headless. Results are written as
+one JSON document (to stdout or --output) for comparing versions.
+
+Usage: python benchmarks/bench_suite.py [--sizes 1000 10000 100000] [--minutes 1440] [--output results.json]
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Headless audio and no import banner on stdout; must be set before pygame is imported
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np  # noqa: E402
+
+from _common import seed  # noqa: E402
+from alarm_monitor import AlarmMonitor  # noqa: E402
+from alarm_sound import AlarmSoundGenerator  # noqa: E402
+from async_monitor import FakeClock  # noqa: E402
+from database import AlarmDatabase  # noqa: E402
+
+UI_PAGE_SIZE = 50
+
+
+def summarize(samples):
+    """Latency statistics in milliseconds"""
+    if not samples:
+        return {'n': 0}
+    ordered = sorted(samples)
+    return {
+        'n': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1e3, 4),
+        'p50_ms': round(ordered[len(ordered) // 2] * 1e3, 4),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1e3, 4),
+        'max_ms': round(ordered[-1] * 1e3, 4),
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_check_loop(monitor: AlarmMonitor, clock: FakeClock, minutes: int):
+    """Polling checks every 30 s and scheduler steps every minute over `minutes` virtual minutes"""
+    start = clock.now()
+    polling = []
+    for _ in range(minutes * 2):
+        clock.advance(30)
+        polling.append(timed(monitor.check_alarms))
+    polling_triggers = len(monitor.fired_days)
+
+    scheduler = monitor.scheduler
+    # The fire table is built lazily by the first next_deadline()
+    rebuild = timed(lambda: (scheduler.rebuild(monitor.db.get_alarm_records(active_only=True), start),
+                             scheduler.next_deadline()))
+    steps = []
+    due = 0
+    for minute in range(1, minutes + 1):
+        now = start + datetime.timedelta(minutes=minute)
+        began = time.perf_counter()
+        scheduler.next_deadline()
+        due += len(scheduler.pop_due(now))
+        steps.append(time.perf_counter() - began)
+
+    return {
+        'virtual_minutes': minutes,
+        'polling': dict(summarize(polling), triggers=polling_triggers),
+        'scheduler': dict(summarize(steps), rebuild_ms=round(rebuild * 1e3, 4), due=due),
+    }
+
+
+def bench_trigger_to_log(monitor: AlarmMonitor, samples: int):
+    """trigger_alarm() alone, and until the history row is committed"""
+    alarms = monitor.db.get_alarm_records()[:samples]
+    calls, committed = [], []
+    for alarm in alarms:
+        began = time.perf_counter()
+        monitor.trigger_alarm(alarm)
+        calls.append(time.perf_counter() - began)
+        monitor.history_writer.flush()
+        committed.append(time.perf_counter() - began)
+
+    # A whole minute's worth at once, as the monitor fires them
+    began = time.perf_counter()
+    for alarm in alarms:
+        monitor.trigger_alarm(alarm)
+    monitor.history_writer.flush()
+    burst = time.perf_counter() - began
+    return {
+        'trigger_call': summarize(calls),
+        'trigger_to_commit': summarize(committed),
+        'burst': {'triggers': len(alarms), 'total_ms': round(burst * 1e3, 4)},
+    }
+
+
+def bench_next_alarm(db: AlarmDatabase, now: datetime.datetime, repeat: int):
+    """get_next_alarm with the cache reloaded each call, and served from memory"""
+    cold, warm = [], []
+    for _ in range(repeat):
+        db.alarm_cache.invalidate()
+        cold.append(timed(lambda: db.get_next_alarm(now)))
+    for _ in range(repeat * 10):
+        warm.append(timed(lambda: db.get_next_alarm(now)))
+    return {'cold': summarize(cold), 'warm': summarize(warm)}
+
+
+def ui_rerun(db: AlarmDatabase):
+    """The database reads one uncached Streamlit rerun makes"""
+    db.get_data_versions()
+    db.get_alarms_page(None, UI_PAGE_SIZE)
+    db.count_alarms()
+    db.get_next_alarm()
+    db.get_recent_triggered_alarms()
+
+
+def bench_ui_fetch(db: AlarmDatabase, repeat: int):
+    """A rerun after an alarm change (cold cache) and a plain rerun (warm), plus a filtered page"""
+    cold, warm, filtered = [], [], []
+    for _ in range(repeat):
+        db.alarm_cache.invalidate()
+        cold.append(timed(lambda: ui_rerun(db)))
+        warm.append(timed(lambda: ui_rerun(db)))
+        filtered.append(timed(lambda: (db.get_alarms_page(None, UI_PAGE_SIZE, "alarm 1", True, "monday"),
+                                       db.count_alarms("alarm 1", True, "monday"))))
+    return {'cold': summarize(cold), 'warm': summarize(warm), 'filtered_page': summarize(filtered)}
+
+
+def bench_sound_generation(repeat: int):
+    generator = AlarmSoundGenerator()
+    results = {}
+    for name, fn in (
+        ('render_alarm_sound', generator.render_alarm_sound),
+        ('render_simple_tone', generator.render_simple_tone),
+        ('stream_30s', lambda: list(generator.stream_alarm_sound(30))),
+        ('wav_bytes', lambda: generator.to_wav_bytes(generator.render_alarm_sound())),
+    ):
+        results[name] = summarize([timed(fn) for _ in range(repeat)])
+    return results
+
+
+def bench_size(count: int, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = AlarmDatabase(os.path.join(tmp, "alarms.db"))
+        seed_time = timed(lambda: seed(db, count))
+
+        start = datetime.datetime.now().astimezone().replace(hour=0, minute=0, second=0, microsecond=0)
+        clock = FakeClock(start)
+        monitor = AlarmMonitor(db, mode="polling", clock=clock)
+        try:
+            result = {
+                'alarms': count,
+                'seed_ms': round(seed_time * 1e3, 2),
+                'get_next_alarm': bench_next_alarm(db, clock.now(), args.repeat),
+                'check_loop': bench_check_loop(monitor, clock, args.minutes),
+                'trigger_to_log': bench_trigger_to_log(monitor, args.trigger_samples),
+                'ui_fetch': bench_ui_fetch(db, args.repeat),
+            }
+        finally:
+            monitor.stop_monitoring()
+            if monitor.audio_player is not None:
+                monitor.audio_player.stop_alarm()
+            db.close()
+        return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--minutes", type=int, default=1440, help="Virtual minutes for the check loop")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--trigger-samples", type=int, default=200)
+    parser.add_argument("--output", help="Write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'args': vars(args),
+        },
+        'sound_generation': None,
+        'sizes': {},
+    }
+
+    # The monitor prints every trigger; keep stdout for the JSON
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        report['sound_generation'] = bench_sound_generation(args.repeat)
+        for count in args.sizes:
+            print(f"benchmarking {count} alarms...", file=sys.stderr)
+            report['sizes'][str(count)] = bench_size(count, args)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
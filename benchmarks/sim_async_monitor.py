@@ -0,0 +1,124 @@
+"""Drive the asyncio alarm monitor through simulated days on a fake clock
+
+Usage: python benchmarks/sim_async_monitor.py [--alarms N] [--days N] [--webhook] [--log-file]
+
+Seeds a temporary database with N daily alarms and one countdown timer,
+runs AsyncAlarmMonitor on a FakeClock until every alarm has fired --days
+times, and reports wall time and per-sink delivery stats. A counting sink
+must receive every trigger even though a deliberately stuck sink times out
+and sheds load next to it, and compacting the history afterwards must leave
+the per-alarm trigger counts unchanged.
+"""
+import argparse
+import asyncio
+import datetime
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from _common import seed  # noqa: E402
+from async_monitor import AsyncAlarmMonitor, FakeClock  # noqa: E402
+from database import AlarmDatabase  # noqa: E402
+from notification_sinks import LogFileSink, NotificationSink, WebhookSink  # noqa: E402
+from scheduler import WEEKDAYS  # noqa: E402
+
+
+class CountingSink(NotificationSink):
+    """Records how many triggers arrived"""
+    name = "counting"
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.received = 0
+
+    async def send(self, event):
+        self.received += 1
+
+
+class StuckSink(NotificationSink):
+    """Never finishes in time, like an unreachable notification service"""
+    name = "stuck"
+
+    async def send(self, event):
+        await asyncio.sleep(3600)
+
+
+class _CountingHandler(http.server.BaseHTTPRequestHandler):
+    """Local stand-in for a webhook receiver"""
+    received = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        type(self).received += 1
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alarms", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--webhook", action="store_true", help="Add a webhook sink to a local server")
+    parser.add_argument("--log-file", action="store_true", help="Add a JSON-lines log file sink")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = AlarmDatabase(os.path.join(tmp, "sim.db"))
+        seed(db, args.alarms, days=WEEKDAYS)
+
+        # Virtual time outruns the sinks, so lossless queues must hold every trigger
+        expected = args.alarms * args.days + 1
+        counting = CountingSink(max_pending=expected)
+        sinks = [counting, StuckSink(timeout=0.05, max_pending=100)]
+        server = None
+        if args.webhook:
+            server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _CountingHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            sinks.append(WebhookSink(f"http://127.0.0.1:{server.server_port}/", timeout=1.0,
+                                     max_pending=1000, workers=8))
+        if args.log_file:
+            sinks.append(LogFileSink(os.path.join(tmp, "triggers.jsonl"), max_pending=expected))
+
+        start = datetime.datetime.now().astimezone().replace(hour=0, minute=0, second=0, microsecond=0)
+        clock = FakeClock(start)
+        # A standalone timer, logged without an alarm id
+        db.create_countdown("countdown", 90, now=clock.now())
+        monitor = AsyncAlarmMonitor(db, sinks=sinks, clock=clock, drain_timeout=1.0)
+
+        began = time.perf_counter()
+        asyncio.run(monitor.run(until=start + datetime.timedelta(days=args.days)))
+        elapsed = time.perf_counter() - began
+
+        print(f"simulated {args.days} day(s): {monitor.trigger_count} triggers in {elapsed:.2f}s "
+              f"({monitor.trigger_count / elapsed:,.0f}/s)")
+        for sink in sinks:
+            print(f"  {sink.name:>8}: {sink.stats}")
+        if server is not None:
+            print(f"  webhook stand-in received {_CountingHandler.received}")
+            server.shutdown()
+
+        window = (start - datetime.timedelta(days=1), clock.now() + datetime.timedelta(days=1))
+        counts = db.get_alarm_trigger_counts(*window)
+        print(f"  history rows: {sum(counts.values())}")
+        # Roll every raw row into the daily aggregates; the counts must not move
+        compacted = db.compact_history(retention_days=0, now=window[1] + datetime.timedelta(days=1))
+        compacted_counts = db.get_alarm_trigger_counts(*window)
+        print(f"  compacted rows: {compacted}")
+        db.close()
+
+        assert compacted_counts == counts, "trigger counts changed by compaction"
+
+        assert monitor.trigger_count == expected, (monitor.trigger_count, expected)
+        assert counting.received == expected, (counting.received, expected)
+
+
+if __name__ == "__main__":
+    main()
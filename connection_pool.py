@@ -0,0 +1,96 @@
+import sqlite3
+import threading
+import queue
+from contextlib import contextmanager
+from typing import List
+
+# Pragmas applied to every pooled connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",     # Readers never block the writer
+    "PRAGMA synchronous=NORMAL",   # Safe with WAL, avoids an fsync per commit
+    "PRAGMA cache_size=-8000",     # ~8 MB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=OFF",
+)
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections shared across threads
+
+    A connection is checked out for the duration of a `with pool.connection()`
+    block and returned afterwards, so the UI thread and the monitor thread
+    can share the pool safely. Nested blocks on the same thread reuse the
+    connection that thread already holds. Each connection keeps its own
+    prepared-statement cache (`cached_statements`).
+    """
+
+    def __init__(self, db_path: str, max_size: int = 4, timeout: float = 5.0,
+                 cached_statements: int = 128):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _create_connection(self) -> sqlite3.Connection:
+        """Open a new connection with the pool pragmas applied"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, opening a new one while under max_size"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._all) < self.max_size:
+                conn = self._create_connection()
+                self._all.append(conn)
+                return conn
+
+        return self._idle.get(timeout=self.timeout)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection; commit on success and roll back on error"""
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            # Re-entrant use on the same thread joins the outer transaction
+            yield held
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._local.conn = None
+            self._idle.put(conn)
+
+    def close_all(self):
+        """Close every connection owned by the pool"""
+        with self._lock:
+            connections, self._all = self._all, []
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                print(f"Error closing database connection: {e}")
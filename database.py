@@ -1,16 +1,87 @@
-import sqlite3
 import datetime
 import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable, Tuple, Iterable, Iterator
+from zoneinfo import ZoneInfo
+from scheduler import days_to_mask, time_to_minute
+from connection_pool import ConnectionPool
+from alarm_record import TIMER_KINDS, Alarm, Timer, alarm_row_factory, timer_row_factory
+from alarm_cache import AlarmCache
+from occurrence_engine import LOOKAHEAD, as_utc, get_zone, utc_to_local
+from metrics import METRICS
+from sound_bank import SoundBank, sound_bank_path
+
+ALARM_COLUMNS = "id, name, time, days_mask, is_active, created_at, minute_of_day, timezone, sound"
+TIMER_COLUMNS = "id, kind, label, fire_at, alarm_id"
+
+
+def _query_timer(method):
+    """Record a method's latency in db_query_duration_seconds{method=...}"""
+    return METRICS.timed("db_query_duration_seconds", "SQL latency per AlarmDatabase method",
+                         method=method.__name__.lstrip("_"))(method)
+
 
 class AlarmDatabase:
-    def __init__(self, db_path: str = "alarms.db"):
+    def __init__(self, db_path: str = "alarms.db", pool_size: int = 4,
+                 history_retention_days: int = 30, cache_max_staleness: float = 1.0):
         self.db_path = db_path
+        # Raw alarm_history rows older than this are rolled up by compact_history()
+        self.history_retention_days = history_retention_days
+        self.pool = ConnectionPool(db_path, max_size=pool_size)
+        # Chosen alarm sounds are rendered into this shared file when alarms
+        # are created or edited, so triggering one never synthesizes audio;
+        # the monitor's player adds the default sound on start
+        self.sound_bank = SoundBank(sound_bank_path(db_path))
+        self._rendered_sounds = set()
+        self._change_listeners: List[Callable[[], None]] = []
+        self._timer_listeners: List[Callable[[], None]] = []
         self.init_database()
+        # Alarm reads are served from memory; see AlarmCache for invalidation
+        self.alarm_cache = AlarmCache(db_path, self._load_alarm_records, cache_max_staleness)
+
+    def add_change_listener(self, callback: Callable[[], None]):
+        """Register a callback invoked after alarms are created, toggled or deleted"""
+        self._change_listeners.append(callback)
+
+    def remove_change_listener(self, callback: Callable[[], None]):
+        """Unregister a previously added change callback"""
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+
+    def add_timer_listener(self, callback: Callable[[], None]):
+        """Register a callback invoked after timers are created or cancelled"""
+        self._timer_listeners.append(callback)
+
+    def remove_timer_listener(self, callback: Callable[[], None]):
+        """Unregister a previously added timer callback"""
+        if callback in self._timer_listeners:
+            self._timer_listeners.remove(callback)
+
+    def _notify_timers_change(self):
+        """Notify timer listeners; the alarm cache and alarm listeners are left alone"""
+        for callback in list(self._timer_listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error notifying timer change: {e}")
+
+    def _notify_change(self):
+        """Invalidate the alarm cache and notify listeners that the alarm set changed"""
+        self.alarm_cache.invalidate()
+        for callback in list(self._change_listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error notifying alarm change: {e}")
     
+    def close(self):
+        """Close all pooled database connections"""
+        self.alarm_cache.close()
+        self.sound_bank.close()
+        self.pool.close_all()
+
     def init_database(self):
         """Initialize the database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             # Create alarms table
@@ -21,7 +92,11 @@ class AlarmDatabase:
                     time TEXT NOT NULL,
                     days TEXT NOT NULL,
                     is_active BOOLEAN DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    days_mask INTEGER NOT NULL DEFAULT 0,
+                    minute_of_day INTEGER NOT NULL DEFAULT 0,
+                    timezone TEXT,
+                    sound TEXT
                 )
             ''')
             
@@ -35,122 +110,548 @@ class AlarmDatabase:
                     FOREIGN KEY (alarm_id) REFERENCES alarms (id)
                 )
             ''')
-            
+
+            self._migrate(conn)
+
             conn.commit()
-    
-    def create_alarm(self, name: str, time: datetime.time, days: List[str]) -> bool:
-        """Create a new alarm"""
+
+    def _migrate(self, conn):
+        """Upgrade an existing database file in place, tracked by PRAGMA user_version"""
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+
+        if version < 1:
+            # v1: weekday bitmask and minute-of-day columns replace JSON decoding
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(alarms)')}
+            if 'days_mask' not in columns:
+                conn.execute('ALTER TABLE alarms ADD COLUMN days_mask INTEGER NOT NULL DEFAULT 0')
+            if 'minute_of_day' not in columns:
+                conn.execute('ALTER TABLE alarms ADD COLUMN minute_of_day INTEGER NOT NULL DEFAULT 0')
+
+            rows = conn.execute('SELECT id, time, days FROM alarms').fetchall()
+            conn.executemany(
+                'UPDATE alarms SET days_mask = ?, minute_of_day = ? WHERE id = ?',
+                [(days_to_mask(json.loads(days)), time_to_minute(time_str), alarm_id)
+                 for alarm_id, time_str, days in rows]
+            )
+
+            # Covers "which active alarms fire at minute M on weekday W" (dropped in v11)
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_alarms_schedule
+                ON alarms (is_active, minute_of_day, days_mask)
+            ''')
+            conn.execute('PRAGMA user_version = 1')
+
+        if version < 2:
+            # v2: history indexes and per-alarm daily rollups for compacted history
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_history_triggered_at
+                ON alarm_history (triggered_at)
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_history_alarm_time
+                ON alarm_history (alarm_id, triggered_at)
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS alarm_history_daily (
+                    alarm_id INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    alarm_name TEXT,
+                    trigger_count INTEGER NOT NULL,
+                    PRIMARY KEY (alarm_id, day)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_history_daily_day
+                ON alarm_history_daily (day)
+            ''')
+            conn.execute('PRAGMA user_version = 2')
+
+        if version < 3:
+            # v3: change counters visible to every process (bumped by triggers until v9)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS data_version (
+                    name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            ''')
+            conn.execute("INSERT OR IGNORE INTO data_version (name) VALUES ('alarms'), ('history')")
+            for table, name in (('alarms', 'alarms'), ('alarm_history', 'history')):
+                for event in ('INSERT', 'UPDATE', 'DELETE'):
+                    conn.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                        AFTER {event} ON {table}
+                        BEGIN
+                            UPDATE data_version SET version = version + 1 WHERE name = '{name}';
+                        END
+                    ''')
+            conn.execute('PRAGMA user_version = 3')
+
+        if version < 4:
+            # v4: last fired day per alarm so a restarted monitor does not re-fire
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS alarm_fired (
+                    alarm_id INTEGER PRIMARY KEY,
+                    day_ordinal INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('PRAGMA user_version = 4')
+
+        if version < 5:
+            # v5: keyset pagination of the alarm list in (minute_of_day, id) order
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_alarms_minute
+                ON alarms (minute_of_day)
+            ''')
+            conn.execute('PRAGMA user_version = 5')
+
+        if version < 6:
+            # v6: per-alarm IANA timezone; NULL keeps the system local zone
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(alarms)')}
+            if 'timezone' not in columns:
+                conn.execute('ALTER TABLE alarms ADD COLUMN timezone TEXT')
+            conn.execute('PRAGMA user_version = 6')
+
+        if version < 7:
+            # v7: one-shot, snooze and countdown timers; fire_at is UTC epoch seconds
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS timers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    fire_at REAL NOT NULL,
+                    alarm_id INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.execute('PRAGMA user_version = 7')
+
+        if version < 8:
+            # v8: per-alarm sound from the sound bank; NULL plays the default
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(alarms)')}
+            if 'sound' not in columns:
+                conn.execute('ALTER TABLE alarms ADD COLUMN sound TEXT')
+            conn.execute('PRAGMA user_version = 8')
+
+        if version < 9:
+            # v9: the change counters are bumped once per write transaction by
+            # the write methods (_bump_versions); per-row triggers made bulk
+            # writes and history compaction pay one extra UPDATE per row
+            for table in ('alarms', 'alarm_history'):
+                for event in ('insert', 'update', 'delete'):
+                    conn.execute(f'DROP TRIGGER IF EXISTS {table}_version_{event}')
+            conn.execute('PRAGMA user_version = 9')
+
+        if version < 10:
+            # v10: change counter for the timers table, so the UI reads it only when it moves
+            conn.execute("INSERT OR IGNORE INTO data_version (name) VALUES ('timers')")
+            conn.execute('PRAGMA user_version = 10')
+
+        if version < 11:
+            # v11: fire times come from the in-memory fire table, so no query
+            # looks alarms up by (minute, weekday) any more; the index only
+            # slowed down every insert and update
+            conn.execute('DROP INDEX IF EXISTS idx_alarms_schedule')
+            conn.execute('PRAGMA user_version = 11')
+
+    @staticmethod
+    def _bump_versions(conn, *names: str):
+        """Advance data_version counters inside the caller's write transaction"""
+        conn.execute(
+            f"UPDATE data_version SET version = version + 1 WHERE name IN ({', '.join('?' * len(names))})",
+            names
+        )
+
+    @staticmethod
+    def _check_sound(sound: Optional[str]):
+        """Raise ValueError for an unknown sound name; None is the default sound"""
+        if sound:
+            # Imported here so alarms without a sound never load NumPy
+            from alarm_sound import sound_pattern
+            sound_pattern(sound)
+
+    def _render_sounds(self, sounds: Iterable[str]):
+        """Render chosen sounds into the sound bank, each at most once per bank
+
+        The alarms are already stored, so failures (e.g. an unwritable or
+        corrupt bank file) are only logged; such alarms play the default
+        sound until theirs is in the bank.
+        """
+        for sound in set(sounds) - self._rendered_sounds:
+            try:
+                self.sound_bank.ensure(sound)
+                self._rendered_sounds.add(sound)
+            except Exception as e:
+                print(f"Error rendering alarm sound {sound}: {e}")
+
+    @_query_timer
+    def get_data_versions(self) -> Dict[str, int]:
+        """Get change counters for 'alarms', 'history' and 'timers'; they grow on every write"""
+        try:
+            with self.pool.connection() as conn:
+                return dict(conn.execute('SELECT name, version FROM data_version').fetchall())
+        except Exception as e:
+            print(f"Error getting data version: {e}")
+            return {}
+
+    @_query_timer
+    def create_alarm(self, name: str, time: datetime.time, days: List[str],
+                     timezone: Optional[str] = None, sound: Optional[str] = None) -> bool:
+        """Create a new alarm; `timezone` is an IANA zone name, None for local time
+
+        `sound` is a preset or custom tone name, None for the default sound;
+        it is rendered into the sound bank now if it is not there yet.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            if timezone:
+                ZoneInfo(timezone)  # Reject unknown zones up front
+            self._check_sound(sound)
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
-                    INSERT INTO alarms (name, time, days)
-                    VALUES (?, ?, ?)
-                ''', (name, time.strftime("%H:%M"), json.dumps(days)))
+                    INSERT INTO alarms (name, time, days, days_mask, minute_of_day, timezone, sound)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (name, time.strftime("%H:%M"), json.dumps(days),
+                      days_to_mask(days), time.hour * 60 + time.minute, timezone or None, sound or None))
+                self._bump_versions(conn, 'alarms')
                 conn.commit()
-                return True
+            self._notify_change()
+            if sound:
+                self._render_sounds([sound])
+            return True
         except Exception as e:
             print(f"Error creating alarm: {e}")
             return False
     
-    def get_all_alarms(self) -> List[Dict]:
-        """Get all alarms"""
+    @_query_timer
+    def _load_alarm_records(self) -> List[Alarm]:
+        """Read every alarm from the table ordered by time (the alarm cache loader)"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = alarm_row_factory
+            cursor.execute(f'''
+                SELECT {ALARM_COLUMNS}
+                FROM alarms
+                ORDER BY minute_of_day, id
+            ''')
+            return cursor.fetchall()
+
+    def get_alarm_records(self, active_only: bool = False) -> List[Alarm]:
+        """Get alarms as compact Alarm records ordered by time"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT id, name, time, days, is_active, created_at
-                    FROM alarms
-                    ORDER BY time
-                ''')
-                
-                alarms = []
-                for row in cursor.fetchall():
-                    alarms.append({
-                        'id': row[0],
-                        'name': row[1],
-                        'time': row[2],
-                        'days': json.loads(row[3]),
-                        'is_active': bool(row[4]),
-                        'created_at': row[5]
-                    })
-                return alarms
+            if active_only:
+                return self.alarm_cache.active()
+            return self.alarm_cache.all()
         except Exception as e:
             print(f"Error getting alarms: {e}")
             return []
-    
+
+    def get_alarm_record(self, alarm_id: int) -> Optional[Alarm]:
+        """Get one alarm by id"""
+        try:
+            return self.alarm_cache.get(alarm_id)
+        except Exception as e:
+            print(f"Error getting alarm: {e}")
+            return None
+
+    def get_all_alarms(self) -> List[Dict]:
+        """Get all alarms"""
+        return [alarm.to_dict() for alarm in self.get_alarm_records()]
+
     def get_active_alarms(self) -> List[Dict]:
         """Get only active alarms"""
+        return [alarm.to_dict() for alarm in self.get_alarm_records(active_only=True)]
+
+    @staticmethod
+    def _alarm_filters(search: Optional[str], active: Optional[bool],
+                       day: Optional[str]) -> Tuple[List[str], List]:
+        """SQL conditions and parameters for the alarm list filters"""
+        conditions = []
+        params: List = []
+        if search:
+            conditions.append("name LIKE ? ESCAPE '\\'")
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        if active is not None:
+            conditions.append("is_active = ?")
+            params.append(int(active))
+        if day:
+            conditions.append("(days_mask & ?) != 0")
+            params.append(days_to_mask([day]))
+        return conditions, params
+
+    @_query_timer
+    def get_alarms_page(self, after: Optional[Tuple[int, int]] = None, limit: int = 50,
+                        search: Optional[str] = None, active: Optional[bool] = None,
+                        day: Optional[str] = None) -> Tuple[List[Dict], Optional[Tuple[int, int]]]:
+        """Get one page of alarms ordered by time, filtered by name, state and weekday
+
+        `after` is the keyset cursor returned with the previous page; the
+        returned cursor is None on the last page.
+        """
+        conditions, params = self._alarm_filters(search, active, day)
+        if after is not None:
+            conditions.append("(minute_of_day, id) > (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT id, name, time, days, is_active, created_at
+                cursor.row_factory = alarm_row_factory
+                records = cursor.execute(f'''
+                    SELECT {ALARM_COLUMNS}
                     FROM alarms
-                    WHERE is_active = 1
-                    ORDER BY time
-                ''')
-                
-                alarms = []
-                for row in cursor.fetchall():
-                    alarms.append({
-                        'id': row[0],
-                        'name': row[1],
-                        'time': row[2],
-                        'days': json.loads(row[3]),
-                        'is_active': bool(row[4]),
-                        'created_at': row[5]
-                    })
-                return alarms
+                    {where}
+                    ORDER BY minute_of_day, id
+                    LIMIT ?
+                ''', params + [limit + 1]).fetchall()
         except Exception as e:
-            print(f"Error getting active alarms: {e}")
-            return []
-    
+            print(f"Error getting alarm page: {e}")
+            return [], None
+
+        # One extra row tells whether another page follows
+        has_more = len(records) > limit
+        records = records[:limit]
+        next_cursor = (records[-1].minute_of_day, records[-1].id) if has_more else None
+        return [alarm.to_dict() for alarm in records], next_cursor
+
+    @_query_timer
+    def count_alarms(self, search: Optional[str] = None, active: Optional[bool] = None,
+                     day: Optional[str] = None) -> int:
+        """Count alarms matching the alarm list filters"""
+        conditions, params = self._alarm_filters(search, active, day)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        try:
+            with self.pool.connection() as conn:
+                return conn.execute(f'SELECT COUNT(*) FROM alarms {where}', params).fetchone()[0]
+        except Exception as e:
+            print(f"Error counting alarms: {e}")
+            return 0
+
+    @_query_timer
     def toggle_alarm(self, alarm_id: int) -> bool:
         """Toggle alarm active status"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     UPDATE alarms 
                     SET is_active = NOT is_active 
                     WHERE id = ?
                 ''', (alarm_id,))
+                self._bump_versions(conn, 'alarms')
                 conn.commit()
-                return True
+            self._notify_change()
+            return True
         except Exception as e:
             print(f"Error toggling alarm: {e}")
             return False
     
+    @_query_timer
     def delete_alarm(self, alarm_id: int) -> bool:
         """Delete an alarm"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('DELETE FROM alarms WHERE id = ?', (alarm_id,))
+                self._bump_versions(conn, 'alarms')
                 conn.commit()
-                return True
+            self._notify_change()
+            return True
         except Exception as e:
             print(f"Error deleting alarm: {e}")
             return False
     
+    @_query_timer
+    def create_alarms_bulk(self, alarms: Iterable[Dict]) -> int:
+        """Create many alarms in one transaction; returns how many were inserted
+
+        Each alarm is a dict with 'name', 'time' (datetime.time or "HH:MM"),
+        'days' (weekday names) and optionally 'is_active', 'timezone' and 'sound'. The
+        iterable is consumed lazily, so a generator keeps memory flat.
+        """
+        # Distinct chosen sounds, rendered into the sound bank after the insert
+        sounds = set()
+
+        def rows():
+            for alarm in alarms:
+                alarm_time = alarm['time']
+                if isinstance(alarm_time, str):
+                    # Rejects out-of-range hours and minutes such as "7:75" or "25:00"
+                    minute = time_to_minute(alarm_time)
+                else:
+                    minute = alarm_time.hour * 60 + alarm_time.minute
+                days = list(alarm['days'])
+                timezone = alarm.get('timezone') or None
+                if timezone:
+                    ZoneInfo(timezone)
+                sound = alarm.get('sound') or None
+                if sound and sound not in sounds:
+                    self._check_sound(sound)
+                    sounds.add(sound)
+                yield (
+                    alarm['name'], f"{minute // 60:02d}:{minute % 60:02d}", json.dumps(days),
+                    days_to_mask(days), minute, bool(alarm.get('is_active', True)), timezone, sound
+                )
+
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.executemany('''
+                    INSERT INTO alarms (name, time, days, days_mask, minute_of_day, is_active, timezone, sound)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows())
+                inserted = cursor.rowcount
+                self._bump_versions(conn, 'alarms')
+            self._notify_change()
+            self._render_sounds(sounds)
+            return inserted
+        except Exception as e:
+            print(f"Error creating alarms: {e}")
+            return 0
+
+    @_query_timer
+    def toggle_alarms_bulk(self, alarm_ids: Iterable[int], active: Optional[bool] = None) -> int:
+        """Flip, or set to `active`, many alarms in one transaction; returns rows changed"""
+        if active is None:
+            query = 'UPDATE alarms SET is_active = NOT is_active WHERE id = ?'
+            params = ((alarm_id,) for alarm_id in alarm_ids)
+        else:
+            query = 'UPDATE alarms SET is_active = ? WHERE id = ?'
+            params = ((int(active), alarm_id) for alarm_id in alarm_ids)
+
+        try:
+            with self.pool.connection() as conn:
+                changed = conn.executemany(query, params).rowcount
+                self._bump_versions(conn, 'alarms')
+            self._notify_change()
+            return changed
+        except Exception as e:
+            print(f"Error toggling alarms: {e}")
+            return 0
+
+    @_query_timer
+    def set_alarms_sound_bulk(self, alarm_ids: Iterable[int], sound: Optional[str]) -> int:
+        """Change the sound of many alarms in one transaction; returns rows changed
+
+        The sound is rendered into the sound bank afterwards if it is not there yet.
+        """
+        try:
+            self._check_sound(sound)
+            with self.pool.connection() as conn:
+                changed = conn.executemany(
+                    'UPDATE alarms SET sound = ? WHERE id = ?',
+                    ((sound or None, alarm_id) for alarm_id in alarm_ids)
+                ).rowcount
+                self._bump_versions(conn, 'alarms')
+            self._notify_change()
+            if sound:
+                self._render_sounds([sound])
+            return changed
+        except Exception as e:
+            print(f"Error changing alarm sounds: {e}")
+            return 0
+
+    @_query_timer
+    def delete_alarms_bulk(self, alarm_ids: Iterable[int]) -> int:
+        """Delete many alarms in one transaction; returns rows deleted"""
+        try:
+            with self.pool.connection() as conn:
+                deleted = conn.executemany(
+                    'DELETE FROM alarms WHERE id = ?', ((alarm_id,) for alarm_id in alarm_ids)
+                ).rowcount
+                self._bump_versions(conn, 'alarms')
+            self._notify_change()
+            return deleted
+        except Exception as e:
+            print(f"Error deleting alarms: {e}")
+            return 0
+
+    def iter_all_alarms(self, batch_size: int = 1000) -> Iterator[Dict]:
+        """Yield every alarm in id order, reading one keyset page at a time"""
+        last_id = 0
+        while True:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = alarm_row_factory
+                records = cursor.execute(f'''
+                    SELECT {ALARM_COLUMNS}
+                    FROM alarms
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                ''', (last_id, batch_size)).fetchall()
+            if not records:
+                return
+            for alarm in records:
+                yield alarm.to_dict()
+            last_id = records[-1].id
+
+    @_query_timer
     def log_alarm_trigger(self, alarm_id: int, alarm_name: str):
         """Log when an alarm is triggered"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO alarm_history (alarm_id, alarm_name)
                     VALUES (?, ?)
                 ''', (alarm_id, alarm_name))
+                self._bump_versions(conn, 'history')
                 conn.commit()
         except Exception as e:
             print(f"Error logging alarm trigger: {e}")
     
+    @_query_timer
+    def log_alarm_triggers(self, entries: List[Tuple[int, str, str]],
+                           fired_days: Optional[List[Tuple[int, int]]] = None):
+        """Log many alarm triggers as (alarm_id, alarm_name, triggered_at) in one transaction
+
+        `fired_days` holds (alarm_id, day_ordinal) pairs saved in the same
+        transaction for get_fired_days().
+        """
+        try:
+            with self.pool.connection() as conn:
+                conn.executemany('''
+                    INSERT INTO alarm_history (alarm_id, alarm_name, triggered_at)
+                    VALUES (?, ?, ?)
+                ''', entries)
+                if entries:
+                    self._bump_versions(conn, 'history')
+                if fired_days:
+                    conn.executemany('''
+                        INSERT INTO alarm_fired (alarm_id, day_ordinal) VALUES (?, ?)
+                        ON CONFLICT (alarm_id) DO UPDATE SET day_ordinal = excluded.day_ordinal
+                    ''', fired_days)
+        except Exception as e:
+            print(f"Error logging alarm triggers: {e}")
+
+    @_query_timer
+    def get_fired_days(self, since_day: int) -> List[Tuple[int, int]]:
+        """Get (alarm_id, day_ordinal) of alarms that last fired on or after a date ordinal"""
+        try:
+            with self.pool.connection() as conn:
+                return conn.execute(
+                    'SELECT alarm_id, day_ordinal FROM alarm_fired WHERE day_ordinal >= ?',
+                    (since_day,)
+                ).fetchall()
+        except Exception as e:
+            print(f"Error getting fired alarms: {e}")
+            return []
+
+    @_query_timer
+    def prune_fired_days(self, before_day: int):
+        """Drop fired-day records older than a date ordinal"""
+        try:
+            with self.pool.connection() as conn:
+                conn.execute('DELETE FROM alarm_fired WHERE day_ordinal < ?', (before_day,))
+        except Exception as e:
+            print(f"Error pruning fired alarms: {e}")
+
+    @_query_timer
     def get_recent_triggered_alarms(self, limit: int = 5) -> List[Dict]:
         """Get recently triggered alarms"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT alarm_id, alarm_name, triggered_at
@@ -171,52 +672,211 @@ class AlarmDatabase:
             print(f"Error getting alarm history: {e}")
             return []
     
-    def get_next_alarm(self) -> Optional[Dict]:
+    @_query_timer
+    def compact_history(self, retention_days: Optional[int] = None,
+                        now: Optional[datetime.datetime] = None) -> int:
+        """Roll history rows older than the retention window into daily aggregates
+
+        Returns the number of raw rows compacted. Timestamps in alarm_history
+        are UTC, so the cutoff is computed in UTC; a naive `now` is taken as
+        system local time.
+        """
+        retention_days = self.history_retention_days if retention_days is None else retention_days
+        now = as_utc(now or datetime.datetime.now(datetime.timezone.utc))
+        # Cut on a day boundary so each rolled-up day is complete
+        cutoff = (now - datetime.timedelta(days=retention_days)).strftime("%Y-%m-%d 00:00:00")
+
+        try:
+            with self.pool.connection() as conn:
+                conn.execute('''
+                    INSERT INTO alarm_history_daily (alarm_id, day, alarm_name, trigger_count)
+                    SELECT COALESCE(alarm_id, 0), date(triggered_at), MAX(alarm_name), COUNT(*)
+                    FROM alarm_history
+                    WHERE triggered_at < ?
+                    GROUP BY COALESCE(alarm_id, 0), date(triggered_at)
+                    ON CONFLICT (alarm_id, day) DO UPDATE SET
+                        trigger_count = trigger_count + excluded.trigger_count,
+                        alarm_name = excluded.alarm_name
+                ''', (cutoff,))
+                cursor = conn.execute('DELETE FROM alarm_history WHERE triggered_at < ?', (cutoff,))
+                if cursor.rowcount:
+                    self._bump_versions(conn, 'history')
+                return cursor.rowcount
+        except Exception as e:
+            print(f"Error compacting alarm history: {e}")
+            return 0
+
+    @_query_timer
+    def get_alarm_trigger_counts(self, start: datetime.datetime, end: datetime.datetime,
+                                 alarm_id: Optional[int] = None) -> Dict[int, int]:
+        """Count triggers per alarm between two instants (naive = system local time)
+
+        Compacted history is read from the daily aggregates, so for days
+        older than the retention window the range is rounded to whole UTC days.
+        Standalone timers are counted under alarm id 0, as in the aggregates.
+        """
+        start, end = as_utc(start), as_utc(end)
+        start_ts = start.strftime("%Y-%m-%d %H:%M:%S")
+        end_ts = end.strftime("%Y-%m-%d %H:%M:%S")
+        alarm_filter = "" if alarm_id is None else "AND alarm_id = ?"
+        # Raw rows keep NULL for standalone timers; IS still uses the index
+        raw_filter = "" if alarm_id is None else "AND alarm_id IS ?"
+        extra = () if alarm_id is None else (alarm_id,)
+        raw_extra = () if alarm_id is None else (alarm_id or None,)
+
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.execute(f'''
+                    SELECT alarm_id, SUM(trigger_count) FROM (
+                        SELECT alarm_id, trigger_count
+                        FROM alarm_history_daily
+                        WHERE day BETWEEN ? AND ? {alarm_filter}
+                        UNION ALL
+                        SELECT COALESCE(alarm_id, 0), 1
+                        FROM alarm_history
+                        WHERE triggered_at BETWEEN ? AND ? {raw_filter}
+                    )
+                    GROUP BY alarm_id
+                ''', (start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")) + extra +
+                     (start_ts, end_ts) + raw_extra)
+                return {row[0]: row[1] for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"Error counting alarm triggers: {e}")
+            return {}
+
+    def get_next_alarms(self, count: int = 1, now: Optional[datetime.datetime] = None) -> List[Dict]:
+        """Get the next `count` alarms to trigger, soonest first, with a 'next_trigger' key
+
+        Each alarm appears once, with its next firing; get_alarm_firings()
+        lists every firing. 'next_trigger' is an aware datetime in the
+        alarm's own timezone. A naive `now` is taken as system local time.
+        """
+        now = as_utc(now or datetime.datetime.now(datetime.timezone.utc))
+        try:
+            upcoming = self.alarm_cache.fire_table(now, now + LOOKAHEAD).next_alarms_after(now, count)
+        except Exception as e:
+            print(f"Error getting next alarms: {e}")
+            return []
+        return [self._with_trigger(alarm, trigger_time) for trigger_time, alarm in upcoming]
+
+    def get_next_alarm(self, now: Optional[datetime.datetime] = None) -> Optional[Dict]:
         """Get the next alarm that will trigger"""
-        active_alarms = self.get_active_alarms()
-        if not active_alarms:
+        upcoming = self.get_next_alarms(1, now)
+        return upcoming[0] if upcoming else None
+
+    def get_alarm_firings(self, start: datetime.datetime, end: datetime.datetime) -> List[Dict]:
+        """Get every firing of an active alarm in [start, end], in time order"""
+        try:
+            firings = self.alarm_cache.fire_table(start, end).firings_between(start, end)
+        except Exception as e:
+            print(f"Error getting alarm firings: {e}")
+            return []
+        return [self._with_trigger(alarm, trigger_time) for trigger_time, alarm in firings]
+
+    def get_due_alarms(self, after: datetime.datetime,
+                       until: datetime.datetime) -> List[Tuple[datetime.datetime, Alarm]]:
+        """Get (UTC trigger time, alarm) for active alarms due in (after, until]"""
+        try:
+            return self.alarm_cache.fire_table(after, until).due(after, until)
+        except Exception as e:
+            print(f"Error getting due alarms: {e}")
+            return []
+
+    @_query_timer
+    def create_timer(self, label: str, fire_time: datetime.datetime, kind: str = "oneshot",
+                     alarm_id: Optional[int] = None) -> Optional[int]:
+        """Create a timer firing once at `fire_time` (naive = local time); returns its id
+
+        A snooze replaces any pending snooze of the same alarm.
+        """
+        try:
+            if kind not in TIMER_KINDS:
+                raise ValueError(f"unknown timer kind {kind!r}")
+            with self.pool.connection() as conn:
+                if kind == "snooze":
+                    conn.execute("DELETE FROM timers WHERE kind = 'snooze' AND alarm_id = ?", (alarm_id,))
+                cursor = conn.execute('''
+                    INSERT INTO timers (kind, label, fire_at, alarm_id) VALUES (?, ?, ?, ?)
+                ''', (kind, label, as_utc(fire_time).timestamp(), alarm_id))
+                self._bump_versions(conn, 'timers')
+                conn.commit()
+            self._notify_timers_change()
+            return cursor.lastrowid
+        except Exception as e:
+            print(f"Error creating timer: {e}")
             return None
-        
-        now = datetime.datetime.now()
-        current_weekday = now.strftime('%A').lower()
-        
-        # Map weekday names to numbers
-        weekday_map = {
-            'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-            'friday': 4, 'saturday': 5, 'sunday': 6
-        }
-        
-        next_alarm = None
-        next_trigger_time = None
-        
-        for alarm in active_alarms:
-            alarm_time = datetime.datetime.strptime(alarm['time'], "%H:%M").time()
-            
-            for day in alarm['days']:
-                # Calculate next occurrence of this alarm
-                days_ahead = weekday_map[day] - now.weekday()
-                
-                if days_ahead < 0:  # Target day already happened this week
-                    days_ahead += 7
-                elif days_ahead == 0:  # Target day is today
-                    if alarm_time > now.time():
-                        # Alarm is later today
-                        days_ahead = 0
-                    else:
-                        # Alarm already passed today, next week
-                        days_ahead = 7
-                
-                trigger_time = now + datetime.timedelta(days=days_ahead)
-                trigger_time = trigger_time.replace(
-                    hour=alarm_time.hour,
-                    minute=alarm_time.minute,
-                    second=0,
-                    microsecond=0
-                )
-                
-                if next_trigger_time is None or trigger_time < next_trigger_time:
-                    next_trigger_time = trigger_time
-                    next_alarm = alarm.copy()
-                    next_alarm['next_trigger'] = trigger_time
-        
-        return next_alarm
+
+    def create_countdown(self, label: str, seconds: float,
+                         now: Optional[datetime.datetime] = None) -> Optional[int]:
+        """Create a timer firing `seconds` from now; returns its id"""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        return self.create_timer(label, now + datetime.timedelta(seconds=seconds), "countdown")
+
+    def snooze_alarm(self, alarm_id: int, minutes: float = 5,
+                     now: Optional[datetime.datetime] = None) -> Optional[int]:
+        """Fire an alarm again `minutes` from now; returns the snooze timer id"""
+        alarm = self.get_alarm_record(alarm_id)
+        if alarm is None:
+            print(f"Error snoozing alarm: no alarm {alarm_id}")
+            return None
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        return self.create_timer(alarm.name, now + datetime.timedelta(minutes=minutes), "snooze", alarm_id)
+
+    @_query_timer
+    def cancel_timer(self, timer_id: int) -> bool:
+        """Cancel a pending timer"""
+        try:
+            with self.pool.connection() as conn:
+                conn.execute('DELETE FROM timers WHERE id = ?', (timer_id,))
+                self._bump_versions(conn, 'timers')
+                conn.commit()
+            self._notify_timers_change()
+            return True
+        except Exception as e:
+            print(f"Error cancelling timer: {e}")
+            return False
+
+    @_query_timer
+    def get_timers(self, after_id: int = 0) -> List[Timer]:
+        """Get pending timers with an id above `after_id`, soonest first"""
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = timer_row_factory
+                cursor.execute(f'''
+                    SELECT {TIMER_COLUMNS}
+                    FROM timers
+                    WHERE id > ?
+                    ORDER BY fire_at, id
+                ''', (after_id,))
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"Error getting timers: {e}")
+            return []
+
+    @_query_timer
+    def claim_timers(self, timer_ids: Iterable[int]) -> List[int]:
+        """Delete fired timers in one transaction; returns the ids that were still pending
+
+        Timers cancelled in the meantime are left out, so they never fire.
+        """
+        claimed = []
+        try:
+            with self.pool.connection() as conn:
+                for timer_id in timer_ids:
+                    if conn.execute('DELETE FROM timers WHERE id = ?', (timer_id,)).rowcount:
+                        claimed.append(timer_id)
+                if claimed:
+                    self._bump_versions(conn, 'timers')
+                conn.commit()
+        except Exception as e:
+            print(f"Error claiming timers: {e}")
+            return []
+        return claimed
+
+    @staticmethod
+    def _with_trigger(alarm: Alarm, trigger_time: datetime.datetime) -> Dict:
+        """Dict form of an alarm plus its trigger time in the alarm's timezone"""
+        entry = alarm.to_dict()
+        entry['next_trigger'] = utc_to_local(trigger_time, get_zone(alarm.timezone))
+        return entry
@@ -0,0 +1,118 @@
+import datetime
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple
+
+_STOP = object()
+# Queue item asking for a compact_history() run after the pending batch
+_COMPACT = object()
+
+
+class _FiredDay(tuple):
+    """Queue item marking (alarm_id, day_ordinal) as fired"""
+
+    def __new__(cls, alarm_id: int, day_ordinal: int):
+        return super().__new__(cls, (alarm_id, day_ordinal))
+
+
+class TriggerHistoryWriter:
+    """Write-behind queue that batches alarm_history inserts
+
+    Triggers are timestamped when queued and written by a background thread
+    in one transaction per batch, flushed once `max_batch` entries are waiting
+    or `flush_interval` seconds after the first one, whichever comes first.
+    """
+
+    def __init__(self, db, max_batch: int = 100, flush_interval: float = 1.0):
+        self.db = db
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def log(self, alarm_id: Optional[int], alarm_name: str,
+            triggered_at: Optional[datetime.datetime] = None):
+        """Queue a trigger for writing; never blocks on disk"""
+        # Same UTC format as the column's CURRENT_TIMESTAMP default
+        triggered_at = triggered_at or datetime.datetime.now(datetime.timezone.utc)
+        self._ensure_started()
+        self._queue.put((alarm_id, alarm_name, triggered_at.strftime("%Y-%m-%d %H:%M:%S")))
+
+    def log_fired(self, alarm_id: int, day_ordinal: int):
+        """Queue the alarm's last fired day; saved in the same transaction as history"""
+        self._ensure_started()
+        self._queue.put(_FiredDay(alarm_id, day_ordinal))
+
+    def compact_history(self):
+        """Queue the daily history compaction; it runs on the writer thread, off the trigger path"""
+        self._ensure_started()
+        self._queue.put(_COMPACT)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued so far; return False if the timeout expired"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Flush pending entries and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _ensure_started(self):
+        """Start the writer thread on first use"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Collect entries into batches and write each batch in one transaction"""
+        running = True
+        while running:
+            item = self._queue.get()
+            batch: List[Tuple] = []
+            fired_days: List[Tuple[int, int]] = []
+            waiters: List[threading.Event] = []
+            compact = False
+            deadline = time.monotonic() + self.flush_interval
+
+            while True:
+                if item is _STOP:
+                    running = False
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                if item is _COMPACT:
+                    compact = True
+                    break
+                if isinstance(item, _FiredDay):
+                    fired_days.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) + len(fired_days) >= self.max_batch:
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch or fired_days:
+                self.db.log_alarm_triggers(batch, fired_days)
+            if compact:
+                self.db.compact_history()
+            for waiter in waiters:
+                waiter.set()
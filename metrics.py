@@ -0,0 +1,199 @@
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds, from sub-millisecond queries to minute-late triggers
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    """Monotonically increasing value"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def sample(self) -> Dict:
+        return {'value': self.value}
+
+
+class Gauge:
+    """Value that goes up and down, e.g. a queue depth"""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def sample(self) -> Dict:
+        return {'value': self.value}
+
+
+class Histogram:
+    """Observations counted into fixed buckets, plus their count and sum
+
+    observe() is a bisect and three additions under a lock, cheap enough to
+    leave on around every query and trigger.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def sample(self) -> Dict:
+        """Cumulative bucket counts as [upper bound, count] pairs, Prometheus style"""
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+        cumulative = 0
+        buckets = []
+        for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += bucket_count
+            buckets.append([bound, cumulative])
+        return {'count': count, 'sum': total, 'buckets': buckets}
+
+
+class _Family:
+    """A metric name with its type, help text and one child per label set"""
+
+    def __init__(self, kind: str, help: str, factory: Callable):
+        self.kind = kind
+        self.help = help
+        self.factory = factory
+        self.children: Dict[LabelKey, object] = {}
+
+
+class MetricsRegistry:
+    """Named counters, gauges and histograms with labels
+
+    Look metrics up once and keep the returned object on hot paths; the
+    lookup itself takes the registry lock.
+    """
+
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, kind: str, name: str, help: str, factory: Callable, labels: Dict[str, str]):
+        key = tuple(sorted((label, str(value)) for label, value in labels.items()))
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = _Family(kind, help, factory)
+            elif family.kind != kind:
+                raise ValueError(f"Metric {name} is a {family.kind}, not a {kind}")
+            child = family.children.get(key)
+            if child is None:
+                child = family.children[key] = family.factory()
+            return child
+
+    def counter(self, name: str, help: str = "", **labels) -> Counter:
+        return self._child("counter", name, help, Counter, labels)
+
+    def gauge(self, name: str, help: str = "", **labels) -> Gauge:
+        return self._child("gauge", name, help, Gauge, labels)
+
+    def histogram(self, name: str, help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS,
+                  **labels) -> Histogram:
+        return self._child("histogram", name, help, lambda: Histogram(buckets), labels)
+
+    def timed(self, name: str, help: str = "", **labels) -> Callable:
+        """Decorator recording each call's duration in a histogram"""
+        histogram = self.histogram(name, help, **labels)
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict:
+        """Plain, JSON-ready copy of every metric"""
+        with self._lock:
+            families = [(name, family, list(family.children.items()))
+                        for name, family in self._families.items()]
+        return {
+            name: {
+                'type': family.kind,
+                'help': family.help,
+                'samples': [dict(child.sample(), labels=dict(key)) for key, child in children],
+            }
+            for name, family, children in families
+        }
+
+    def render_prometheus(self) -> str:
+        return render_prometheus(self.snapshot())
+
+
+def _label_text(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels.items()) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{label}="{value}"' for (label, _), value in zip(pairs, escaped)) + "}"
+
+
+def render_prometheus(snapshot: Dict) -> str:
+    """A snapshot in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for name, family in snapshot.items():
+        if family['help']:
+            lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for sample in family['samples']:
+            labels = sample['labels']
+            if family['type'] != "histogram":
+                lines.append(f"{name}{_label_text(labels)} {sample['value']:g}")
+                continue
+            for bound, count in sample['buckets']:
+                le = bound if bound == "+Inf" else f"{bound:g}"
+                lines.append(f"{name}_bucket{_label_text(labels, ('le', le))} {count}")
+            lines.append(f"{name}_sum{_label_text(labels)} {sample['sum']:g}")
+            lines.append(f"{name}_count{_label_text(labels)} {sample['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def histogram_quantile(sample: Dict, q: float) -> Optional[float]:
+    """Estimate a quantile from a histogram sample by interpolating inside its bucket"""
+    count = sample['count']
+    if not count:
+        return None
+    rank = q * count
+    lower, below = 0.0, 0
+    for bound, cumulative in sample['buckets']:
+        if cumulative >= rank:
+            if bound == "+Inf":
+                # Past the last finite bucket: the best answer is that bound
+                return lower
+            in_bucket = cumulative - below
+            return lower + (bound - lower) * ((rank - below) / in_bucket if in_bucket else 0)
+        lower, below = bound, cumulative
+    return lower
+
+
+# Process-wide registry used by the monitor, database and audio modules
+METRICS = MetricsRegistry()
@@ -0,0 +1,186 @@
+import datetime
+from typing import List, Optional, Tuple
+from database import AlarmDatabase
+from alarm_record import Alarm, Timer
+from scheduler import AlarmScheduler
+from occurrence_engine import get_zone, utc_to_local
+from history_writer import TriggerHistoryWriter
+from trigger_dedup import FiredDayTracker
+from pending_timers import PendingTimers
+from metrics import METRICS
+
+TRIGGER_LATENESS = METRICS.histogram(
+    "alarm_trigger_lateness_seconds", "Actual minus scheduled trigger time"
+)
+TRIGGERS = METRICS.counter("alarm_triggers_total", "Alarms triggered")
+
+
+def check_duration(mode: str):
+    """Histogram of the time a monitor spends per check, excluding sleep"""
+    return METRICS.histogram("alarm_check_duration_seconds",
+                             "Time per alarm check or scheduler step, excluding waits", mode=mode)
+
+
+def timer_sound(db: AlarmDatabase, timer: Timer) -> Optional[str]:
+    """Sound a timer plays: its alarm's for snoozes, the default otherwise"""
+    alarm = db.get_alarm_record(timer.alarm_id) if timer.alarm_id is not None else None
+    return alarm.sound if alarm is not None else None
+
+
+class MonitorCore:
+    """Scheduling and trigger bookkeeping shared by AlarmMonitor and AsyncAlarmMonitor
+
+    Subclasses own the waiting (a thread condition or an asyncio event) and
+    the delivery of triggers, through _now(), notify_change(),
+    notify_timers(), _notify_alarm(), _notify_timer() and _stop_sound().
+    """
+
+    def __init__(self, db: AlarmDatabase, max_sleep: float, mode: str):
+        self.db = db
+        self.history_writer = TriggerHistoryWriter(db)
+        self.is_running = False
+        self.trigger_count = 0
+
+        # Last day each alarm fired, restored from the database so a restart
+        # does not re-fire alarms that already sounded today
+        self.fired_days = FiredDayTracker()
+        today = utc_to_local(self._now(), None).date().toordinal()
+        self.fired_days.load(self.db.get_fired_days(today - 1))
+
+        # Upper bound on a single wait so wall-clock jumps (suspend, NTP) are noticed
+        self.max_sleep = max_sleep
+        self.scheduler = AlarmScheduler()
+        # One-shot, snooze and countdown timers, fired at second resolution
+        self.timers = PendingTimers(db, self._now())
+        self._check_duration = check_duration(mode)
+        self._schedule_dirty = True
+        self._schedule_date = None
+        self._alarms_version = None
+        self.db.add_change_listener(self.notify_change)
+        self.db.add_timer_listener(self.notify_timers)
+
+    def _now(self) -> datetime.datetime:
+        """Current time, aware in UTC"""
+        raise NotImplementedError
+
+    def notify_change(self):
+        """Wake the monitor so it reloads the alarm set"""
+        raise NotImplementedError
+
+    def notify_timers(self):
+        """Wake the monitor so it loads new timers; the alarm schedule is kept"""
+        raise NotImplementedError
+
+    def _prepare(self, now: datetime.datetime) -> Optional[datetime.datetime]:
+        """Reschedule if the alarms changed, roll the day and load new timers
+
+        Returns the earliest alarm or timer deadline (UTC), if any.
+        """
+        # The alarm cache reloads on writes from this or other processes
+        # (e.g. the UI); a reload shows up as a new version
+        alarms_version = self.db.alarm_cache.version()
+        if alarms_version != self._alarms_version:
+            self._alarms_version = alarms_version
+            self._schedule_dirty = True
+
+        if self._schedule_dirty:
+            self._schedule_dirty = False
+            # Include the current minute so a (re)build inside an alarm's
+            # minute still fires it, as polling would
+            minute_start = now.replace(second=0, microsecond=0)
+            self.scheduler.rebuild(
+                self.db.get_alarm_records(active_only=True),
+                minute_start - datetime.timedelta(microseconds=1)
+            )
+
+        self._roll_day(utc_to_local(now, None).date())
+        self._silence_snoozed(self.timers.load_new())
+        return min(filter(None, (self.scheduler.next_deadline(),
+                                 self.timers.next_deadline())), default=None)
+
+    def _wait_timeout(self, now: datetime.datetime,
+                      deadline: Optional[datetime.datetime]) -> Optional[float]:
+        """Seconds to wait for the next deadline, or None if something is due now"""
+        if deadline is not None and deadline <= now:
+            return None
+        timeout = self.max_sleep
+        if deadline is not None:
+            timeout = min(timeout, (deadline - now).total_seconds())
+        return timeout
+
+    def _pop_due(self, now: datetime.datetime) -> Tuple[List[Tuple[datetime.datetime, Alarm]], List[Timer]]:
+        """Alarms (with their trigger times) and timers due by `now`"""
+        return self.scheduler.pop_due(now), self.timers.pop_due(now)
+
+    def _fire(self, due: List[Tuple[datetime.datetime, Alarm]], due_timers: List[Timer]):
+        """Trigger what _pop_due() returned"""
+        for trigger_time, alarm in due:
+            self._trigger_once(alarm, trigger_time)
+        for timer in due_timers:
+            self.trigger_timer(timer)
+
+    def _roll_day(self, today: datetime.date):
+        """Daily housekeeping when the date changes"""
+        if today == self._schedule_date:
+            return
+        self._schedule_date = today
+
+        # Keep yesterday so alarms caught up across midnight are still de-duplicated
+        keep_from = today.toordinal() - 1
+        self.fired_days.evict_before(keep_from)
+        self.db.prune_fired_days(keep_from)
+        # Daily retention job for the trigger history, run by the writer thread
+        # so alarms due at midnight never wait on it
+        self.history_writer.compact_history()
+
+    def _trigger_once(self, alarm: Alarm, trigger_time: datetime.datetime):
+        """Trigger an alarm unless it already fired on the same day"""
+        # The alarm's own calendar day, so a DST change never splits or merges days
+        day = utc_to_local(trigger_time, get_zone(alarm.timezone)).toordinal()
+        if self.fired_days.has_fired(alarm.id, day):
+            return
+        self.fired_days.mark(alarm.id, day)
+        self.history_writer.log_fired(alarm.id, day)
+        TRIGGER_LATENESS.observe((self._now() - trigger_time).total_seconds())
+        self.trigger_alarm(alarm, trigger_time)
+
+    def trigger_alarm(self, alarm: Alarm, trigger_time: Optional[datetime.datetime] = None):
+        """Log an alarm trigger and deliver it"""
+        try:
+            self.trigger_count += 1
+            TRIGGERS.inc()
+            # Logged in batches off this thread
+            self.history_writer.log(alarm.id, alarm.name, self._now())
+            self._notify_alarm(alarm, trigger_time or self._now())
+        except Exception as e:
+            print(f"Error triggering alarm {alarm.name}: {e}")
+
+    def trigger_timer(self, timer: Timer):
+        """Log a one-shot, snooze or countdown timer and deliver it"""
+        try:
+            now = self._now()
+            TRIGGER_LATENESS.observe((now - timer.fire_time).total_seconds())
+            self.trigger_count += 1
+            TRIGGERS.inc()
+            self.history_writer.log(timer.alarm_id, timer.label, now)
+            self._notify_timer(timer)
+        except Exception as e:
+            print(f"Error triggering timer {timer.label}: {e}")
+
+    def _silence_snoozed(self, timers: List[Timer]):
+        """Stop the sound of alarms that were just snoozed"""
+        for timer in timers:
+            if timer.kind == "snooze":
+                self._stop_sound(timer.alarm_id)
+
+    def _notify_alarm(self, alarm: Alarm, trigger_time: datetime.datetime):
+        """Deliver an alarm trigger (sound, notifications)"""
+        raise NotImplementedError
+
+    def _notify_timer(self, timer: Timer):
+        """Deliver a timer firing"""
+        raise NotImplementedError
+
+    def _stop_sound(self, alarm_id: Optional[int]):
+        """Silence an alarm that is sounding, if any"""
+        raise NotImplementedError
@@ -0,0 +1,220 @@
+"""Standalone alarm monitor: one process owns scheduling and playback
+
+Run it next to the Streamlit app:
+
+    python monitor_daemon.py [--db alarms.db] [--port 47123]
+        [--webhook URL] [--log-file PATH] [--desktop] [--no-audio | --headless]
+        [--metrics-port 9464] [--print-metrics]
+
+UI processes write alarms to the database and send a "changed" datagram to
+127.0.0.1:<port> so the daemon reschedules immediately; the daemon also
+notices database changes on its own through the alarm cache version checks.
+New or cancelled timers send "timers" instead, which only wakes the monitor
+to load them and leaves the alarm schedule alone.
+Binding the port doubles as the single-instance guard, so however many UI
+sessions or servers are open there is only ever one monitor. A "metrics"
+datagram is answered with the daemon's metrics snapshot as JSON.
+"""
+import argparse
+import json
+import signal
+import socket
+import threading
+from typing import List, Optional, TYPE_CHECKING
+from database import AlarmDatabase
+from metrics import METRICS, render_prometheus
+from sound_bank import SoundBank
+
+if TYPE_CHECKING:
+    from notification_sinks import NotificationSink
+
+MONITOR_HOST = "127.0.0.1"
+MONITOR_PORT = 47123
+
+
+def notify_monitor(port: int = MONITOR_PORT, message: bytes = b"changed"):
+    """Tell the monitor daemon that alarms changed (fire-and-forget)"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(message, (MONITOR_HOST, port))
+    except Exception as e:
+        print(f"Error notifying alarm monitor: {e}")
+
+
+def notify_monitor_timers(port: int = MONITOR_PORT):
+    """Tell the monitor daemon that timers changed, without reloading alarms"""
+    notify_monitor(port, b"timers")
+
+
+def is_monitor_running(port: int = MONITOR_PORT, timeout: float = 0.5) -> bool:
+    """Check whether a monitor daemon answers on the local port"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(timeout)
+            sock.sendto(b"ping", (MONITOR_HOST, port))
+            reply, _ = sock.recvfrom(16)
+            return reply == b"pong"
+    except (socket.timeout, ConnectionRefusedError):
+        return False
+    except Exception as e:
+        print(f"Error contacting alarm monitor: {e}")
+        return False
+
+
+def fetch_monitor_metrics(port: int = MONITOR_PORT, timeout: float = 0.5) -> Optional[dict]:
+    """Metrics snapshot of the running monitor daemon, or None if it does not answer"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(timeout)
+            sock.sendto(b"metrics", (MONITOR_HOST, port))
+            reply, _ = sock.recvfrom(65535)
+            return json.loads(reply)
+    except (socket.timeout, ConnectionRefusedError):
+        return None
+    except Exception as e:
+        print(f"Error fetching monitor metrics: {e}")
+        return None
+
+
+def serve_metrics(port: int):
+    """Serve METRICS in the Prometheus text format on 127.0.0.1:<port>/metrics"""
+    # Imported here so daemons without a metrics port never load http.server
+    import http.server
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = METRICS.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((MONITOR_HOST, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_sinks(audio: bool = True, webhook: Optional[str] = None, log_file: Optional[str] = None,
+                desktop: bool = False, sound_bank: Optional[SoundBank] = None) -> List["NotificationSink"]:
+    """Notification sinks for the asyncio monitor from command-line options
+
+    `sound_bank` holds the per-alarm sounds the audio sink plays.
+    """
+    # Imported here so the UI, which only needs notify_monitor(), never loads asyncio
+    from notification_sinks import AudioSink, ConsoleSink, DesktopSink, LogFileSink, WebhookSink
+
+    sinks: List["NotificationSink"] = [ConsoleSink()]
+    if audio:
+        sinks.append(AudioSink(sound_bank=sound_bank))
+    if webhook:
+        sinks.append(WebhookSink(webhook))
+    if log_file:
+        sinks.append(LogFileSink(log_file))
+    if desktop:
+        sinks.append(DesktopSink())
+    return sinks
+
+
+def run_daemon(db_path: str = "alarms.db", port: int = MONITOR_PORT, mode: str = "asyncio",
+               audio: bool = True, metrics_port: Optional[int] = None, webhook: Optional[str] = None,
+               log_file: Optional[str] = None, desktop: bool = False) -> int:
+    """Run the monitor until SIGINT/SIGTERM; returns a process exit code
+
+    `webhook`, `log_file` and `desktop` add notification sinks (see
+    build_sinks) and only apply to the "asyncio" mode; every mode plays
+    audio unless `audio` is False. With `metrics_port` the metrics are also
+    served over HTTP for Prometheus.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.bind((MONITOR_HOST, port))
+    except OSError:
+        print(f"Alarm monitor already running on port {port}")
+        sock.close()
+        return 1
+
+    db = AlarmDatabase(db_path)
+    if mode == "asyncio":
+        from async_monitor import AsyncAlarmMonitor
+        # The audio sink plays from the database's own sound bank mapping
+        sinks = build_sinks(audio, webhook, log_file, desktop, db.sound_bank)
+        monitor = AsyncAlarmMonitor(db, sinks=sinks)
+    else:
+        # Imported per mode so each daemon only loads the monitor it runs
+        from alarm_monitor import AlarmMonitor
+        monitor = AlarmMonitor(db, mode=mode, audio=audio)
+    monitor_thread = threading.Thread(target=monitor.start_monitoring, daemon=True)
+    monitor_thread.start()
+    metrics_server = serve_metrics(metrics_port) if metrics_port else None
+
+    stopping = threading.Event()
+
+    def handle_signal(signum, frame):
+        stopping.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    print(f"⏰ Alarm monitor listening on {MONITOR_HOST}:{port}")
+    sock.settimeout(1.0)
+    try:
+        while not stopping.is_set():
+            try:
+                message, address = sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            if message == b"changed":
+                # The write came from another process; don't wait for the cache's version check
+                db.alarm_cache.invalidate()
+                monitor.notify_change()
+            elif message == b"timers":
+                monitor.notify_timers()
+            elif message == b"ping":
+                sock.sendto(b"pong", address)
+            elif message == b"metrics":
+                sock.sendto(json.dumps(METRICS.snapshot()).encode("utf-8"), address)
+    finally:
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        monitor.stop_monitoring()
+        monitor_thread.join(5)
+        db.close()
+        sock.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the shared alarm monitor")
+    parser.add_argument("--db", default="alarms.db", help="SQLite database path")
+    parser.add_argument("--port", type=int, default=MONITOR_PORT, help="Local UDP control port")
+    parser.add_argument("--mode", choices=["asyncio", "scheduler", "polling"], default="asyncio")
+    parser.add_argument("--webhook", help="POST each trigger as JSON to this URL")
+    parser.add_argument("--log-file", help="Append each trigger to this JSON-lines file")
+    parser.add_argument("--desktop", action="store_true", help="Show desktop notifications")
+    parser.add_argument("--no-audio", "--headless", action="store_true",
+                        help="Run headless: never load pygame or play alarm sounds")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics over HTTP on this port")
+    parser.add_argument("--print-metrics", action="store_true",
+                        help="Print the running monitor's metrics in the Prometheus format and exit")
+    args = parser.parse_args()
+    if args.print_metrics:
+        snapshot = fetch_monitor_metrics(args.port)
+        if snapshot is None:
+            print(f"No alarm monitor answering on port {args.port}")
+            raise SystemExit(1)
+        print(render_prometheus(snapshot), end="")
+        return
+    raise SystemExit(run_daemon(args.db, args.port, args.mode, audio=not args.no_audio,
+                                metrics_port=args.metrics_port, webhook=args.webhook,
+                                log_file=args.log_file, desktop=args.desktop))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import asyncio
+import datetime
+import json
+import shutil
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+
+class TriggerEvent(NamedTuple):
+    """One alarm or timer firing, as handed to every notification sink"""
+    alarm_id: Optional[int]  # None for timers not tied to an alarm
+    name: str
+    time: str
+    timezone: Optional[str]
+    trigger_time: datetime.datetime  # Aware, UTC
+    sound: Optional[str] = None  # Sound bank clip; None for the default sound
+
+    def to_dict(self) -> Dict:
+        """JSON-ready form for webhooks and log files"""
+        return {
+            'alarm_id': self.alarm_id,
+            'name': self.name,
+            'time': self.time,
+            'timezone': self.timezone,
+            'trigger_time': self.trigger_time.isoformat(),
+            'sound': self.sound,
+        }
+
+
+class NotificationSink:
+    """Base class for one destination of alarm triggers
+
+    Each sink gets its own bounded queue of `max_pending` events served by
+    `workers` tasks, and every send() is cancelled after `timeout` seconds.
+    """
+    name = "sink"
+
+    def __init__(self, timeout: float = 5.0, max_pending: int = 1000, workers: int = 1):
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.workers = workers
+        self.stats = {'sent': 0, 'failed': 0, 'timed_out': 0, 'dropped': 0}
+
+    async def send(self, event: TriggerEvent):
+        """Deliver one event"""
+        raise NotImplementedError
+
+    async def aclose(self):
+        """Release the sink's resources"""
+
+
+class ConsoleSink(NotificationSink):
+    """Print each trigger to stdout"""
+    name = "console"
+
+    async def send(self, event: TriggerEvent):
+        print(f"🔔 Triggering alarm: {event.name} at {event.time}")
+
+
+class AudioSink(NotificationSink):
+    """Play the alarm sound through an AudioPlayer, created by warm_up() or the first trigger"""
+    name = "audio"
+
+    def __init__(self, audio_player=None, duration: int = 30, sound_bank=None, **options):
+        super().__init__(**options)
+        self.audio_player = audio_player
+        self.duration = duration
+        # SoundBank holding the per-alarm sounds, for the player created here
+        self.sound_bank = sound_bank
+
+    def _player(self):
+        """The audio player, imported and created on first use"""
+        if self.audio_player is None:
+            # Imported here so monitors without audio never load pygame
+            from audio_player import AudioPlayer
+            self.audio_player = AudioPlayer(sound_bank=self.sound_bank)
+        return self.audio_player
+
+    def warm_up(self):
+        """Open the audio device and load the default sound ahead of the first trigger"""
+        self._player().init_mixer()
+
+    def _play(self, alarm_id: Optional[int], sound_name: Optional[str]):
+        self._player().play_alarm_sound(self.duration, alarm_id=alarm_id, sound_name=sound_name)
+
+    async def send(self, event: TriggerEvent):
+        await asyncio.to_thread(self._play, event.alarm_id, event.sound)
+
+
+class LogFileSink(NotificationSink):
+    """Append each trigger to a JSON-lines file"""
+    name = "log"
+
+    def __init__(self, path: str, **options):
+        super().__init__(**options)
+        self.path = path
+        self._handle = None
+
+    def _write(self, line: str):
+        if self._handle is None:
+            self._handle = open(self.path, "a", encoding="utf-8")
+        self._handle.write(line)
+        self._handle.flush()
+
+    async def send(self, event: TriggerEvent):
+        await asyncio.to_thread(self._write, json.dumps(event.to_dict(), ensure_ascii=False) + "\n")
+
+    async def aclose(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class WebhookSink(NotificationSink):
+    """POST each trigger as JSON to a URL"""
+    name = "webhook"
+
+    def __init__(self, url: str, **options):
+        super().__init__(**options)
+        self.url = url
+
+    def _post(self, body: bytes):
+        # Imported on first use: urllib.request pulls in http.client and ssl
+        import urllib.request
+
+        request = urllib.request.Request(
+            self.url, data=body, headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        # The socket timeout frees the worker thread even after wait_for gave up
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    async def send(self, event: TriggerEvent):
+        await asyncio.to_thread(self._post, json.dumps(event.to_dict()).encode("utf-8"))
+
+
+class DesktopSink(NotificationSink):
+    """Show a desktop notification (notify-send on Linux, osascript on macOS)"""
+    name = "desktop"
+
+    def _command(self, event: TriggerEvent) -> Optional[List[str]]:
+        title = f"⏰ {event.name}"
+        if sys.platform == "darwin" and shutil.which("osascript"):
+            script = f"display notification {json.dumps(event.time)} with title {json.dumps(title)}"
+            return ["osascript", "-e", script]
+        if shutil.which("notify-send"):
+            return ["notify-send", title, event.time]
+        return None
+
+    async def send(self, event: TriggerEvent):
+        command = self._command(event)
+        if command is None:
+            raise RuntimeError("no desktop notification command available")
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            await process.wait()
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+
+
+class SinkDispatcher:
+    """Fan trigger events out to sinks, each behind its own bounded queue
+
+    dispatch() never waits: when a sink's queue is full the event is dropped
+    for that sink only and counted in its stats, so a slow or stuck sink
+    cannot delay the monitor or the other sinks. Events still queued or in
+    flight when close() gives up are counted as dropped too, so every
+    dispatched event ends up as sent, failed, timed_out or dropped.
+    """
+
+    def __init__(self, sinks: List[NotificationSink]):
+        self.sinks = sinks
+        self._queues: Dict[NotificationSink, asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Create the queues and worker tasks (call from the running event loop)"""
+        for sink in self.sinks:
+            queue = asyncio.Queue(maxsize=sink.max_pending)
+            self._queues[sink] = queue
+            for _ in range(sink.workers):
+                self._tasks.append(asyncio.create_task(self._worker(sink, queue)))
+
+    def dispatch(self, event: TriggerEvent):
+        """Queue an event for every sink without blocking"""
+        for sink, queue in self._queues.items():
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                sink.stats['dropped'] += 1
+
+    async def _worker(self, sink: NotificationSink, queue: asyncio.Queue):
+        """Deliver a sink's queued events one at a time, each under its timeout"""
+        while True:
+            event = await queue.get()
+            try:
+                await asyncio.wait_for(sink.send(event), sink.timeout)
+                sink.stats['sent'] += 1
+            except asyncio.TimeoutError:
+                sink.stats['timed_out'] += 1
+                print(f"Error in {sink.name} sink: timed out after {sink.timeout}s")
+            except asyncio.CancelledError:
+                # Stopped by close() mid-delivery
+                sink.stats['dropped'] += 1
+                raise
+            except Exception as e:
+                sink.stats['failed'] += 1
+                print(f"Error in {sink.name} sink: {e}")
+            finally:
+                queue.task_done()
+
+    async def close(self, timeout: float = 5.0):
+        """Give queued events up to `timeout` seconds to drain, then stop the workers"""
+        if self._queues:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(queue.join() for queue in self._queues.values())), timeout
+                )
+            except asyncio.TimeoutError:
+                pass
+
+        pending = set(self._tasks)
+        while pending:
+            # wait_for() can swallow a cancellation that races with send()
+            # finishing, leaving the worker parked on queue.get(); cancel again
+            for task in pending:
+                task.cancel()
+            _, pending = await asyncio.wait(pending, timeout=0.1)
+        self._tasks = []
+
+        for sink, queue in self._queues.items():
+            if queue.qsize():
+                sink.stats['dropped'] += queue.qsize()
+                print(f"Error in {sink.name} sink: {queue.qsize()} undelivered triggers dropped on shutdown")
+        self._queues = {}
+
+        for sink in self.sinks:
+            try:
+                await sink.aclose()
+            except Exception as e:
+                print(f"Error closing {sink.name} sink: {e}")
@@ -0,0 +1,204 @@
+import datetime
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from zoneinfo import ZoneInfo
+
+if TYPE_CHECKING:
+    import numpy as np
+    from alarm_record import Alarm
+
+UTC = datetime.timezone.utc
+SECONDS_PER_DAY = 86400
+MINUTES_PER_DAY = 1440
+
+# Every weekly alarm fires within any LOOKAHEAD window (a week plus slack
+# for UTC offset changes); tables span FIRE_TABLE_WINDOW so they are only
+# recomputed about once a week
+LOOKAHEAD = datetime.timedelta(days=8)
+FIRE_TABLE_WINDOW = datetime.timedelta(days=15)
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: Optional[str]) -> Optional[ZoneInfo]:
+    """ZoneInfo for an IANA zone name; None (or an unknown name) is the system local zone"""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except Exception as e:
+        print(f"Error loading timezone {name}: {e}")
+        return None
+
+
+def local_to_utc(local: datetime.datetime, zone: Optional[ZoneInfo]) -> datetime.datetime:
+    """Resolve a naive wall-clock time in a zone (None = system local) to a UTC instant
+
+    A time repeated when clocks go back resolves to its first occurrence and
+    a time skipped when they go forward uses the offset in force before the
+    jump (02:30 becomes 03:30), so each local day yields exactly one instant.
+    """
+    if zone is not None:
+        return local.replace(tzinfo=zone, fold=0).astimezone(UTC)
+
+    # Naive datetimes follow the system rules, but resolve skipped times
+    # the other way round, so pick between both folds explicitly
+    first = local.replace(fold=0).astimezone(UTC)
+    second = local.replace(fold=1).astimezone(UTC)
+    if first == second or first.astimezone().replace(tzinfo=None) == local:
+        return first
+    return second
+
+
+def utc_to_local(instant: datetime.datetime, zone: Optional[ZoneInfo]) -> datetime.datetime:
+    """An aware instant as wall-clock time in a zone (None = system local)"""
+    return instant.astimezone(zone) if zone is not None else instant.astimezone()
+
+
+def as_utc(moment: datetime.datetime) -> datetime.datetime:
+    """An aware instant in UTC; naive datetimes are taken as system local time"""
+    return moment.astimezone(UTC)
+
+
+@lru_cache(maxsize=1024)
+def local_day_instants(zone_name: Optional[str], day: datetime.date) -> "np.ndarray":
+    """UTC epoch seconds of every wall-clock minute of a day in a zone
+
+    Days without an offset change cost one conversion; only the zone's DST
+    transition days are resolved minute by minute.
+    """
+    import numpy as np
+
+    zone = get_zone(zone_name)
+    midnight = datetime.datetime.combine(day, datetime.time())
+    start = int(local_to_utc(midnight, zone).timestamp())
+    end = int(local_to_utc(midnight + datetime.timedelta(days=1), zone).timestamp())
+
+    if end - start == SECONDS_PER_DAY:
+        instants = start + np.arange(MINUTES_PER_DAY, dtype=np.int64) * 60
+    else:
+        instants = np.fromiter(
+            (int(local_to_utc(midnight + datetime.timedelta(minutes=minute), zone).timestamp())
+             for minute in range(MINUTES_PER_DAY)),
+            dtype=np.int64, count=MINUTES_PER_DAY
+        )
+    instants.flags.writeable = False
+    return instants
+
+
+class FireTable:
+    """Sorted UTC fire instants of a set of weekly alarms over [start, end]
+
+    Each alarm's wall-clock time is resolved in its own timezone through
+    local_day_instants(), so DST changes are handled once per local day and
+    lookups are binary searches over one NumPy array.
+    """
+
+    def __init__(self, alarms: List["Alarm"], start: datetime.datetime, end: datetime.datetime):
+        # Imported here so database-only users (CLIs, the UI) never load NumPy
+        import numpy as np
+
+        self.alarms = alarms
+        self.start = as_utc(start)
+        self.end = as_utc(end)
+
+        zones: Dict[Optional[str], List[int]] = {}
+        for index, alarm in enumerate(alarms):
+            zones.setdefault(alarm.timezone, []).append(index)
+
+        instant_parts = []
+        index_parts = []
+        for zone_name, members in zones.items():
+            zone = get_zone(zone_name)
+            members = np.array(members, dtype=np.int64)
+            minutes = np.fromiter((alarms[i].minute_of_day for i in members),
+                                  dtype=np.int64, count=members.size)
+            masks = np.fromiter((alarms[i].days_mask for i in members),
+                                dtype=np.int64, count=members.size)
+
+            # Walk the local days touching the window, with a day of margin
+            day = utc_to_local(self.start, zone).date() - datetime.timedelta(days=1)
+            last_day = utc_to_local(self.end, zone).date() + datetime.timedelta(days=1)
+            while day <= last_day:
+                hits = np.flatnonzero(masks & (1 << day.weekday()))
+                if hits.size:
+                    instant_parts.append(local_day_instants(zone_name, day)[minutes[hits]])
+                    index_parts.append(members[hits])
+                day += datetime.timedelta(days=1)
+
+        instants = np.concatenate(instant_parts) if instant_parts else np.empty(0, dtype=np.int64)
+        indexes = np.concatenate(index_parts) if index_parts else np.empty(0, dtype=np.int64)
+        keep = (instants >= self.start.timestamp()) & (instants <= self.end.timestamp())
+        instants, indexes = instants[keep], indexes[keep]
+
+        # Ties keep alarm order
+        order = np.lexsort((indexes, instants))
+        self.instants = instants[order]
+        self.indexes = indexes[order]
+
+    def __len__(self) -> int:
+        return len(self.instants)
+
+    def covers(self, start: datetime.datetime, end: datetime.datetime) -> bool:
+        """Whether [start, end] lies inside the table's window"""
+        return self.start <= as_utc(start) and as_utc(end) <= self.end
+
+    def _entries(self, lo: int, hi: int) -> List[Tuple[datetime.datetime, "Alarm"]]:
+        """(UTC trigger time, alarm) pairs for a slice of the table"""
+        return [
+            (datetime.datetime.fromtimestamp(int(self.instants[i]), UTC), self.alarms[self.indexes[i]])
+            for i in range(lo, hi)
+        ]
+
+    def _position(self, moment: datetime.datetime, side: str) -> int:
+        """Index of an instant in the table, searched with an integer key
+
+        A float key would make NumPy cast the whole int64 array on every call.
+        """
+        seconds = as_utc(moment).timestamp()
+        key = math.floor(seconds) if side == "right" else math.ceil(seconds)
+        return int(self.instants.searchsorted(key, side=side))
+
+    def next_after(self, after: datetime.datetime, count: int = 1) -> List[Tuple[datetime.datetime, "Alarm"]]:
+        """The next `count` triggers strictly after an instant, soonest first"""
+        lo = self._position(after, "right")
+        return self._entries(lo, min(lo + max(count, 0), len(self.instants)))
+
+    def next_alarms_after(self, after: datetime.datetime,
+                          count: int = 1) -> List[Tuple[datetime.datetime, "Alarm"]]:
+        """The next trigger of each of the `count` soonest alarms strictly after an instant
+
+        Unlike next_after(), an alarm firing several times in a row is listed once.
+        """
+        lo = self._position(after, "right")
+        picked: List[int] = []
+        seen = set()
+        # Scan in growing chunks; most calls are answered by the first one
+        chunk = max(count, 64)
+        while lo < len(self.instants) and len(picked) < count and len(seen) < len(self.alarms):
+            hi = min(lo + chunk, len(self.instants))
+            for i, index in enumerate(self.indexes[lo:hi].tolist(), start=lo):
+                if index not in seen:
+                    seen.add(index)
+                    picked.append(i)
+                    if len(picked) == count:
+                        break
+            lo = hi
+            chunk *= 2
+        return [
+            (datetime.datetime.fromtimestamp(int(self.instants[i]), UTC), self.alarms[self.indexes[i]])
+            for i in picked
+        ]
+
+    def due(self, after: datetime.datetime, until: datetime.datetime) -> List[Tuple[datetime.datetime, "Alarm"]]:
+        """Triggers with after < trigger time <= until, in time order"""
+        lo = self._position(after, "right")
+        hi = self._position(until, "right")
+        return self._entries(lo, hi)
+
+    def firings_between(self, start: datetime.datetime,
+                        end: datetime.datetime) -> List[Tuple[datetime.datetime, "Alarm"]]:
+        """Triggers with start <= trigger time <= end, in time order"""
+        lo = self._position(start, "left")
+        hi = self._position(end, "right")
+        return self._entries(lo, hi)
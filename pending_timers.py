@@ -0,0 +1,49 @@
+import datetime
+from typing import List, Optional
+from alarm_record import Timer
+from database import AlarmDatabase
+from timing_wheel import TimingWheel
+
+# Wheel resolution in seconds: how late at most a timer fires after its second
+TIMER_TICK = 0.1
+
+
+class PendingTimers:
+    """The database's pending timers on a TimingWheel, shared by both monitors
+
+    New rows are picked up incrementally by id, so a sync costs only the
+    timers created since the last one. Cancelled rows stay on the wheel until
+    their time comes and are then dropped by claim_timers(), which also keeps
+    a timer from firing twice.
+    """
+
+    def __init__(self, db: AlarmDatabase, now: datetime.datetime, tick: float = TIMER_TICK):
+        self.db = db
+        self.wheel = TimingWheel(now.timestamp(), tick)
+        self._last_id = 0
+
+    def __len__(self) -> int:
+        return len(self.wheel)
+
+    def load_new(self) -> List[Timer]:
+        """Schedule timers created since the last call and return them"""
+        timers = self.db.get_timers(after_id=self._last_id)
+        for timer in timers:
+            self.wheel.schedule(timer.id, timer.fire_at, timer)
+            self._last_id = max(self._last_id, timer.id)
+        return timers
+
+    def next_deadline(self) -> Optional[datetime.datetime]:
+        """When the wheel next needs advancing, aware in UTC"""
+        deadline = self.wheel.next_deadline()
+        if deadline is None:
+            return None
+        return datetime.datetime.fromtimestamp(deadline, datetime.timezone.utc)
+
+    def pop_due(self, now: datetime.datetime) -> List[Timer]:
+        """Remove and return the timers due by `now` that were not cancelled, soonest first"""
+        expired = self.wheel.advance(now.timestamp())
+        if not expired:
+            return []
+        claimed = set(self.db.claim_timers([timer.id for timer in expired]))
+        return [timer for timer in expired if timer.id in claimed]
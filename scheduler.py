@@ -0,0 +1,97 @@
+import datetime
+from typing import List, Optional, Tuple, TYPE_CHECKING
+from occurrence_engine import FireTable, FIRE_TABLE_WINDOW, LOOKAHEAD, as_utc
+
+if TYPE_CHECKING:
+    from alarm_record import Alarm
+
+# Map weekday names to numbers
+WEEKDAY_MAP = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6
+}
+WEEKDAYS = tuple(WEEKDAY_MAP)
+
+# Day lists for every 7-bit mask (bit N set = weekday N), so decoding is a lookup
+_MASK_DAYS = tuple(
+    tuple(day for day, bit in WEEKDAY_MAP.items() if mask & (1 << bit))
+    for mask in range(128)
+)
+
+
+def days_to_mask(days: List[str]) -> int:
+    """Encode weekday names as a 7-bit mask (bit 0 = monday)"""
+    mask = 0
+    for day in days:
+        mask |= 1 << WEEKDAY_MAP[day]
+    return mask
+
+
+def mask_to_days(mask: int) -> List[str]:
+    """Decode a 7-bit weekday mask into weekday names"""
+    return list(_MASK_DAYS[mask & 0x7F])
+
+
+def time_to_minute(time_str: str) -> int:
+    """Convert an "HH:MM" string to minutes since midnight; raises ValueError if out of range"""
+    hours, minutes = (int(part) for part in time_str.split(":"))
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"invalid time: {time_str}")
+    return hours * 60 + minutes
+
+
+class AlarmScheduler:
+    """Cursor over the precomputed UTC fire instants of the active alarms
+
+    Instants come from a FireTable spanning FIRE_TABLE_WINDOW that is
+    recomputed once the cursor gets within LOOKAHEAD of its end, so DST
+    changes are resolved when the table is built rather than on every tick.
+    """
+
+    def __init__(self):
+        self._alarms: List["Alarm"] = []
+        self._table: Optional[FireTable] = None
+        self._cursor: Optional[datetime.datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._alarms)
+
+    def rebuild(self, alarms: List["Alarm"], after: datetime.datetime):
+        """Replace the schedule with the alarms' fire times strictly after `after`"""
+        self._alarms = alarms
+        self._cursor = as_utc(after)
+        self._table = None
+
+    def _table_from(self, start: datetime.datetime) -> FireTable:
+        """The fire table, recomputed if it no longer reaches LOOKAHEAD past `start`"""
+        if self._table is None or not self._table.covers(start, start + LOOKAHEAD):
+            self._table = FireTable(self._alarms, start, start + FIRE_TABLE_WINDOW)
+        return self._table
+
+    def next_deadline(self) -> Optional[datetime.datetime]:
+        """Get the earliest scheduled fire time (UTC), if any"""
+        if self._cursor is None:
+            return None
+        upcoming = self._table_from(self._cursor).next_after(self._cursor)
+        return upcoming[0][0] if upcoming else None
+
+    def pop_due(self, now: datetime.datetime) -> List[Tuple[datetime.datetime, "Alarm"]]:
+        """Get every alarm due at or before `now` and move the schedule past `now`
+
+        An alarm that was missed several times (e.g. while the machine was
+        suspended) is returned only once, for its earliest missed fire time.
+        """
+        now = as_utc(now)
+        if self._cursor is None or now <= self._cursor:
+            return []
+
+        # Alarms repeat weekly, so a week back finds every missed one
+        start = max(self._cursor, now - datetime.timedelta(days=7))
+        due = []
+        seen = set()
+        for trigger_time, alarm in self._table_from(start).due(start, now):
+            if alarm.id not in seen:
+                seen.add(alarm.id)
+                due.append((trigger_time, alarm))
+        self._cursor = now
+        return due
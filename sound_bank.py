@@ -0,0 +1,173 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within one process
+    fcntl = None
+
+# Sound played by alarms that did not choose one (a SOUND_PRESETS name)
+DEFAULT_SOUND = "classic"
+CUSTOM_TONE_PREFIX = "tone:"
+CUSTOM_TONE_RANGE = (100, 4000)  # Hz
+
+BANK_MAGIC = b"ALRMSND1"
+# Magic, then offset and length of the current JSON index
+_HEADER = struct.Struct("<8sQQ")
+
+
+def custom_tone(frequency: int) -> str:
+    """Sound name of a custom tone (see alarm_sound.sound_pattern)"""
+    return f"{CUSTOM_TONE_PREFIX}{int(frequency)}"
+
+
+def sound_bank_path(db_path: str) -> str:
+    """Sound bank file kept next to a database file"""
+    return os.path.splitext(db_path)[0] + ".sounds"
+
+
+class ClipInfo(NamedTuple):
+    """Where a clip's int16 PCM lives in the bank file"""
+    offset: int
+    frames: int
+    sample_rate: int
+    channels: int
+
+    @property
+    def size(self) -> int:
+        """Clip length in bytes"""
+        return self.frames * self.channels * 2
+
+
+class SoundBank:
+    """Pre-rendered alarm sounds as raw int16 PCM clips in one shared, memory-mapped file
+
+    The file is a header, the clips, and a JSON index of name -> ClipInfo.
+    It is append-only: adding a clip writes the samples and a fresh index
+    after the existing data and only then repoints the header, so readers in
+    other processes never see a half-written clip. Readers map the file
+    read-only and hand out memoryview slices of the mapping, so every UI and
+    monitor process shares the same page-cache copy of the audio.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._map: Optional[mmap.mmap] = None
+        self._header = None
+        self._index: Dict[str, ClipInfo] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return self.info(name) is not None
+
+    def names(self) -> List[str]:
+        """Names of every clip in the bank"""
+        with self._lock:
+            return sorted(self._current_index())
+
+    def info(self, name: str) -> Optional[ClipInfo]:
+        """Location and format of a clip, or None if the bank lacks it"""
+        with self._lock:
+            return self._current_index().get(name)
+
+    def clip(self, name: str) -> Optional[memoryview]:
+        """A clip's samples as a zero-copy slice of the mapped file"""
+        with self._lock:
+            info = self._current_index().get(name)
+            if info is None:
+                return None
+            return memoryview(self._map)[info.offset:info.offset + info.size]
+
+    def _current_index(self) -> Dict[str, ClipInfo]:
+        """The index after picking up new clips; the last good one if the file can't be read"""
+        try:
+            self._refresh()
+        except Exception as e:
+            print(f"Error reading sound bank: {e}")
+        return self._index
+
+    def _refresh(self):
+        """Pick up clips appended by any process since the last look (caller holds the lock)"""
+        if self._map is None:
+            if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+                return
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _HEADER.unpack_from(self._map, 0)
+        if header == self._header:
+            return
+        magic, index_offset, index_length = header
+        if magic != BANK_MAGIC:
+            raise ValueError(f"{self.path} is not a sound bank")
+        if index_offset + index_length > len(self._map):
+            # Grown since it was mapped; slices already handed out keep the old mapping alive
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        index = json.loads(self._map[index_offset:index_offset + index_length] or b"{}")
+        self._index = {name: ClipInfo(*entry) for name, entry in index.items()}
+        self._header = header
+
+    def add(self, name: str, samples, sample_rate: int, channels: int = 1) -> ClipInfo:
+        """Append int16 samples as a clip; a clip already stored under the name is kept"""
+        data = memoryview(samples).cast("B")
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        with self._lock, open(fd, "r+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                end = f.seek(0, os.SEEK_END)
+                if end == 0:
+                    end = f.write(_HEADER.pack(BANK_MAGIC, _HEADER.size, 0))
+                    f.flush()
+                # Another process may have appended since we last looked
+                self._refresh()
+                if name in self._index:
+                    return self._index[name]
+
+                info = ClipInfo(end, len(data) // (2 * channels), sample_rate, channels)
+                index = {key: list(entry) for key, entry in self._index.items()}
+                index[name] = list(info)
+                index_bytes = json.dumps(index).encode("utf-8")
+                f.write(data)
+                f.write(index_bytes)
+                f.flush()
+                os.fsync(f.fileno())
+                # The clip and its index are on disk; publish them with one header write
+                f.seek(0)
+                f.write(_HEADER.pack(BANK_MAGIC, end + len(data), len(index_bytes)))
+                f.flush()
+                self._refresh()
+                return info
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def ensure(self, name: str, generator=None) -> ClipInfo:
+        """Render a preset or custom tone into the bank unless it is already there
+
+        Raises ValueError for unknown sound names.
+        """
+        info = self.info(name)
+        if info is not None:
+            return info
+        if generator is None:
+            # Imported here so opening a bank to read clips never loads NumPy
+            from alarm_sound import AlarmSoundGenerator
+            generator = AlarmSoundGenerator()
+        return self.add(name, generator.render_sound(name), generator.sample_rate)
+
+    def close(self):
+        """Drop the mapping (slices still in use keep it alive until released)"""
+        with self._lock:
+            if self._map is not None:
+                try:
+                    self._map.close()
+                except BufferError:
+                    pass
+            self._map = None
+            self._header = None
+            self._index = {}
@@ -0,0 +1,121 @@
+import io
+import threading
+import time
+import wave
+from typing import Dict, Optional, Tuple
+import pygame
+from alarm_sound import AlarmSoundGenerator
+from metrics import METRICS
+from sound_bank import DEFAULT_SOUND, ClipInfo, SoundBank
+
+
+class SoundCache:
+    """Pre-rendered, ready-to-play alarm sounds keyed by their synthesis parameters
+
+    Each entry is synthesized once, encoded as an in-memory WAV and loaded by
+    pygame straight from that buffer, so triggering an alarm involves no
+    synthesis and no temporary file. Clips from the sound bank are loaded by
+    get_clip() and are never synthesized here.
+    """
+
+    def __init__(self, sound_generator: AlarmSoundGenerator, sound_bank: Optional[SoundBank] = None):
+        self.sound_generator = sound_generator
+        self.sound_bank = sound_bank
+        self._sounds: Dict[Tuple, pygame.mixer.Sound] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, kind: str, frequency: int = 0) -> Tuple:
+        """Cache key covering every parameter that changes the rendered samples"""
+        generator = self.sound_generator
+        return (kind, frequency, generator.sample_rate, generator.duration, generator.pattern)
+
+    def _render(self, kind: str, frequency: int):
+        """Synthesize the samples for a cache entry"""
+        start = time.perf_counter()
+        if kind == "tone":
+            samples = self.sound_generator.render_simple_tone(frequency)
+        else:
+            samples = self.sound_generator.render_alarm_sound()
+        METRICS.histogram("sound_generation_seconds", "Alarm sound synthesis time",
+                          kind=kind).observe(time.perf_counter() - start)
+        return samples
+
+    def get(self, kind: str = "alarm", frequency: int = 0) -> Optional[pygame.mixer.Sound]:
+        """Get a cached sound, rendering and loading it on first use"""
+        key = self._key(kind, frequency)
+        sound = self._sounds.get(key)
+        if sound is not None:
+            return sound
+
+        with self._lock:
+            sound = self._sounds.get(key)
+            if sound is None:
+                try:
+                    wav_bytes = self.sound_generator.to_wav_bytes(self._render(kind, frequency))
+                    sound = pygame.mixer.Sound(file=io.BytesIO(wav_bytes))
+                    self._sounds[key] = sound
+                except Exception as e:
+                    print(f"Error loading alarm sound: {e}")
+                    return None
+        return sound
+
+    def get_clip(self, name: str) -> Optional[pygame.mixer.Sound]:
+        """Load a sound bank clip, or None if the bank lacks it (never synthesizes)"""
+        if self.sound_bank is None:
+            return None
+        info = self.sound_bank.info(name)
+        if info is None:
+            return None
+        # The offset tells apart clips re-added under the name to a replaced bank file
+        key = ("bank", name, info.offset)
+        sound = self._sounds.get(key)
+        if sound is not None:
+            return sound
+
+        with self._lock:
+            sound = self._sounds.get(key)
+            if sound is None:
+                try:
+                    sound = self._load_clip(self.sound_bank.clip(name), info)
+                    self._sounds[key] = sound
+                except Exception as e:
+                    print(f"Error loading sound bank clip {name}: {e}")
+                    return None
+        return sound
+
+    @staticmethod
+    def _load_clip(samples: memoryview, info: ClipInfo) -> pygame.mixer.Sound:
+        """Hand a clip's mmap slice to pygame, converting only if the mixer format differs"""
+        frequency, size, channels = pygame.mixer.get_init()
+        if (frequency, size, channels) == (info.sample_rate, -16, info.channels):
+            return pygame.mixer.Sound(buffer=samples)
+        # Let SDL resample or remix it from a WAV wrapper
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav_file:
+            wav_file.setnchannels(info.channels)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(info.sample_rate)
+            wav_file.writeframes(samples)
+        buffer.seek(0)
+        return pygame.mixer.Sound(file=buffer)
+
+    def warm_up(self):
+        """Load the default alarm sound ahead of the first trigger
+
+        The default clip is rendered into the sound bank once, by the first
+        player to find it missing; if the bank can't take it, the built-in
+        alarm sound and fallback tone are rendered in memory instead.
+        """
+        if self.sound_bank is not None and self.get_clip(DEFAULT_SOUND) is None:
+            try:
+                self.sound_bank.ensure(DEFAULT_SOUND, self.sound_generator)
+            except Exception as e:
+                print(f"Error rendering default sound: {e}")
+        if self.get_clip(DEFAULT_SOUND) is None:
+            self.get("alarm")
+            self.get("tone", 800)
+
+    def clear(self):
+        """Drop every cached sound"""
+        with self._lock:
+            self._sounds.clear()
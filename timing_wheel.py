@@ -0,0 +1,173 @@
+import math
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+# Bucket values are (expires, deadline, item) tuples, `expires` being the
+# tick at which advance() returns the item
+_Record = Tuple[int, float, object]
+
+# Fraction of a tick by which advance() may fall short of a tick boundary and
+# still reach it: a next_deadline() value that went through float division or
+# a datetime (microsecond rounding) can land just below its tick
+_ROUNDING = 1e-3
+
+
+class TimingWheel:
+    """Hierarchical timing wheel: O(1) schedule and cancel of many short-lived timers
+
+    Level 0 has `slots` buckets of one `tick` each, and every level above
+    covers `slots` times the span of the one below (64 slots x 4 levels of
+    one second reach ~194 days; later deadlines wait in an overflow bucket).
+    An entry sits in the bucket matching its expiry tick at the coarsest level
+    that still tells it apart, and is moved one level down ("cascaded") when
+    the level below wraps around to its bucket.
+
+    Deadlines are seconds on any monotonic scale (UTC epoch seconds in the
+    monitor) and are rounded up to whole ticks, so nothing fires early.
+    """
+
+    def __init__(self, now: float, tick: float = 1.0, slots: int = 64, levels: int = 4):
+        if slots & (slots - 1):
+            raise ValueError("slots must be a power of two")
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        # Next tick advance() has to process
+        self._next = math.floor(now / tick)
+        self._wheels: List[List[Dict[Hashable, _Record]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._overflow: Dict[Hashable, _Record] = {}
+        # Bucket currently holding each key, for O(1) cancel
+        self._buckets: Dict[Hashable, Dict[Hashable, _Record]] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._buckets
+
+    def keys(self) -> Iterator[Hashable]:
+        return iter(list(self._buckets))
+
+    def get(self, key: Hashable, default=None):
+        """The item scheduled under `key`"""
+        bucket = self._buckets.get(key)
+        return default if bucket is None else bucket[key][2]
+
+    def schedule(self, key: Hashable, deadline: float, item=None):
+        """Schedule `item` (default: the key) for `deadline`, replacing any entry with the same key"""
+        if key in self._buckets:
+            self.cancel(key)
+        expires = math.ceil(deadline / self.tick)
+        if expires < self._next:
+            # Deadlines already passed fire on the next tick
+            expires = self._next
+        self._place(key, (expires, deadline, key if item is None else item))
+
+    def cancel(self, key: Hashable) -> bool:
+        """Remove a scheduled entry; returns whether there was one"""
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            return False
+        del bucket[key]
+        return True
+
+    def clear(self):
+        for wheel in self._wheels:
+            for bucket in wheel:
+                bucket.clear()
+        self._overflow.clear()
+        self._buckets.clear()
+
+    def _place(self, key: Hashable, record: _Record):
+        """Put an entry in the bucket for its expiry, relative to the current tick"""
+        expires = record[0]
+        bits = self._bits
+        # Each level tells apart `bits` more bits of the distance to expiry
+        level = ((expires - self._next).bit_length() - 1) // bits
+        if level <= 0:
+            bucket = self._wheels[0][expires & self._mask]
+        elif level < self.levels:
+            bucket = self._wheels[level][(expires >> (bits * level)) & self._mask]
+        else:
+            bucket = self._overflow
+        bucket[key] = record
+        self._buckets[key] = bucket
+
+    def _cascade(self, level: int):
+        """Redistribute the level's bucket for the current tick into the levels below"""
+        if level == self.levels:
+            entries = list(self._overflow.items())
+            self._overflow.clear()
+        else:
+            index = (self._next >> (self._bits * level)) & self._mask
+            if index == 0:
+                self._cascade(level + 1)
+            bucket = self._wheels[level][index]
+            entries = list(bucket.items())
+            bucket.clear()
+        for key, record in entries:
+            self._place(key, record)
+
+    def advance(self, now: float) -> List:
+        """Move time forward to `now` and return the expired items, earliest deadline first"""
+        target = math.floor(now / self.tick + _ROUNDING)
+        expired: List[_Record] = []
+        while self._next <= target:
+            if not self._buckets:
+                self._next = target + 1
+                break
+            index = self._next & self._mask
+            if index == 0:
+                self._cascade(1)
+            wheel = self._wheels[0]
+            bucket = wheel[index]
+            if bucket:
+                expired.extend(bucket.values())
+                for key in bucket:
+                    del self._buckets[key]
+                bucket.clear()
+                self._next += 1
+                continue
+            # Jump over empty slots, at most to the next cascade at the end of the level
+            step = 1
+            while index + step < self.slots and not wheel[index + step]:
+                step += 1
+            self._next = min(self._next + step, target + 1)
+
+        expired.sort(key=lambda record: record[1])
+        return [record[2] for record in expired]
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest time at which advance() may return or cascade entries
+
+        Exact for entries due within the level-0 span; further out it is the
+        time the bucket gets cascaded, so waiting until then never misses one.
+        """
+        if not self._buckets:
+            return None
+
+        earliest: Optional[int] = None
+        for level, wheel in enumerate(self._wheels):
+            shift = self._bits * level
+            current = self._next >> shift
+            # Above level 0 the current bucket was cascaded when its span began,
+            # unless that is exactly the next tick
+            started = level > 0 and self._next & ((1 << shift) - 1)
+            for step in range(1 if started else 0, self.slots + 1):
+                bucket = wheel[(current + step) & self._mask]
+                if bucket:
+                    if level == 0:
+                        tick = min(record[0] for record in bucket.values())
+                    else:
+                        tick = (current + step) << shift
+                    earliest = tick if earliest is None else min(earliest, tick)
+                    break
+        if self._overflow:
+            top = self._bits * self.levels
+            tick = ((self._next + (1 << top) - 1) >> top) << top
+            earliest = tick if earliest is None else min(earliest, tick)
+        return max(earliest, self._next) * self.tick
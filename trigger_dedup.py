@@ -0,0 +1,35 @@
+from typing import Dict, Iterable, Tuple
+
+
+class FiredDayTracker:
+    """Last day each alarm fired, as alarm_id -> date ordinal
+
+    Holds at most one small int pair per alarm, so memory is bounded by the
+    number of alarms, and old days are dropped with evict_before().
+    """
+
+    def __init__(self):
+        self._last_fired: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._last_fired)
+
+    def load(self, entries: Iterable[Tuple[int, int]]):
+        """Merge persisted (alarm_id, day_ordinal) pairs"""
+        for alarm_id, day in entries:
+            if day > self._last_fired.get(alarm_id, -1):
+                self._last_fired[alarm_id] = day
+
+    def has_fired(self, alarm_id: int, day: int) -> bool:
+        """Whether the alarm already fired on the given day ordinal"""
+        return self._last_fired.get(alarm_id) == day
+
+    def mark(self, alarm_id: int, day: int):
+        """Record that the alarm fired on the given day ordinal"""
+        self._last_fired[alarm_id] = day
+
+    def evict_before(self, day: int):
+        """Forget alarms whose last trigger is older than the given day ordinal"""
+        self._last_fired = {
+            alarm_id: fired for alarm_id, fired in self._last_fired.items() if fired >= day
+        }